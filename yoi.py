@@ -3,6 +3,9 @@
 # Additional: Download Everything from https://www.voidtools.com/downloads/
 # Enable Everything's HTTP server: Tools > Options > HTTP Server (check "Enable HTTP Server")
 
+import time
+_STARTUP_T0 = time.perf_counter()
+
 import os
 import subprocess
 import pathlib
@@ -12,52 +15,102 @@ from tkinter import font, Canvas
 from tkinter import simpledialog, Toplevel, messagebox
 import webbrowser
 import re
+import ast
 import ctypes
-from ctypes import wintypes
 import sys
-import time
-import fnmatch
 import json
 import sqlite3
 import urllib.request
 import urllib.parse
 import queue
+import heapq
+import bisect
+import hashlib
+import struct
+import ntpath
 import concurrent.futures
+import itertools
+import array
+import stat
+import atexit
+import copy
+import shutil
+from collections import OrderedDict, deque
+
+# ========== LAZY IMPORTS ==========
+
+# Optional subsystems are imported on first use instead of at startup.
+# A proxy is truthy only if its module imports, so `if Image:` replaces the
+# old `Image is not None` checks; attribute access on a missing module
+# raises ImportError. Import cost is recorded for the startup report.
+_lazy_import_ms = {}
+_lazy_import_lock = threading.RLock()
+
+class _LazyModule:
+    def __init__(self, name, *extra):
+        self._name = name
+        self._extra = extra  # submodules that must be loaded alongside
+        self._module = None
+        self._error = None
+
+    def _load(self):
+        if self._module is None and self._error is None:
+            with _lazy_import_lock:
+                if self._module is None and self._error is None:
+                    import importlib
+                    t0 = time.perf_counter()
+                    try:
+                        for extra in self._extra:
+                            importlib.import_module(extra)
+                        self._module = importlib.import_module(self._name)
+                    except Exception as e:
+                        self._error = e
+                    _lazy_import_ms[self._name] = ((time.perf_counter() - t0) * 1000,
+                                                   threading.current_thread().name)
+        if self._module is None:
+            raise ImportError(f"{self._name} is not available: {self._error}")
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __bool__(self):
+        try:
+            self._load()
+            return True
+        except ImportError:
+            return False
+
+# Every module named below must also be listed in yoi.spec's hiddenimports,
+# since PyInstaller can't follow import_module() strings.
 
 # Optional Pillow
-try:
-    from PIL import Image, ImageTk, ImageDraw
-except Exception:
-    Image = ImageTk = ImageDraw = None
+Image = _LazyModule("PIL.Image")
+ImageTk = _LazyModule("PIL.ImageTk")
+ImageDraw = _LazyModule("PIL.ImageDraw")
 
 # Optional pywin32
-HAS_PYWIN32 = False
-try:
-    import win32com.client
-    import win32ui
-    import win32gui
-    import win32con
-    import win32api
-    HAS_PYWIN32 = True
-except Exception:
-    win32com = win32ui = win32gui = win32con = win32api = None
+win32com = _LazyModule("win32com", "win32com.client")
+win32ui = _LazyModule("win32ui")
+win32gui = _LazyModule("win32gui")
+win32con = _LazyModule("win32con")
+win32api = _LazyModule("win32api")
+
+def has_pywin32():
+    return bool(win32gui and win32ui and win32con and win32api and win32com)
 
 # Optional rapidfuzz
-try:
-    from rapidfuzz import process, fuzz
-except Exception:
-    process = None
-    fuzz = None
+process = _LazyModule("rapidfuzz.process")
+fuzz = _LazyModule("rapidfuzz.fuzz")
 
-# Optional keyboard and pyperclip
-try:
-    import keyboard
-except Exception:
-    keyboard = None
-try:
-    import pyperclip
-except Exception:
-    pyperclip = None
+# Optional keyboard, pyperclip and pystray
+keyboard = _LazyModule("keyboard")
+pyperclip = _LazyModule("pyperclip")
+pystray = _LazyModule("pystray")
+
+wintypes = _LazyModule("ctypes.wintypes")
+
+_STARTUP_IMPORTS_DONE = time.perf_counter()
 
 COLORS = {
     "win_bg": "#070707",
@@ -174,13 +227,19 @@ SYSTEM_APPS = [
 ]
 
 # Globals
-apps = []
-icon_cache = {}
+apps = None  # AppCatalog, set by _set_app_catalog
 search_window = None
 entry = None
 canvas = None
 placeholder_label = None
 result_widgets = []
+_row_pool = []
+_visible_rows = 0
+_highlighted_row = -1
+_scroll_top = 0
+_result_source = None
+_result_source_loading = False
+_selection_redraw_pending = False
 search_results = []
 selected_index = -1
 _search_after_id = None
@@ -189,9 +248,40 @@ _origin_y = None
 backspace_empty_count = 0
 _hotkey_registered = False
 _default_icon = None
+_toplevel_hwnd = None
+_render_generation = 0
 everything_available = False
-DB_PATH = os.path.join(os.path.dirname(__file__), "file_index.db")
-PREFS_PATH = os.path.join(os.path.dirname(__file__), "spotlight_prefs.json")
+def _user_data_dir():
+    """Per-user folder for caches and state that must outlive the process.
+    Not next to __file__: in the one-file yoi.exe that is PyInstaller's
+    unpack folder, deleted on exit."""
+    base = (os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_DATA_HOME")
+            or os.path.join(os.path.expanduser("~"), ".local", "share"))
+    return os.path.join(base, "Yoi")
+
+DATA_DIR = _user_data_dir()
+try:
+    os.makedirs(DATA_DIR, exist_ok=True)
+except OSError as e:
+    print(f"[spotlight] could not create {DATA_DIR}: {e}")
+
+def data_path(name):
+    """Path of name in DATA_DIR, adopting a copy left beside the script by
+    older versions (source checkouts kept these files there), together with
+    any SQLite -wal/-shm/-journal sidecars."""
+    path = os.path.join(DATA_DIR, name)
+    legacy = os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+    if legacy != path and os.path.exists(legacy) and not os.path.exists(path):
+        for suffix in ("-wal", "-shm", "-journal", ""):
+            if os.path.exists(legacy + suffix):
+                try:
+                    shutil.move(legacy + suffix, path + suffix)
+                except OSError as e:
+                    print(f"[spotlight] could not move {legacy + suffix} to {DATA_DIR}: {e}")
+    return path
+
+DB_PATH = data_path("file_index.db")
+PREFS_PATH = data_path("spotlight_prefs.json")
 INDEX_PATHS = [
     os.path.expandvars(r"%APPDATA%\Microsoft\Windows\Start Menu\Programs"),
     r"C:\ProgramData\Microsoft\Windows\Start Menu\Programs"
@@ -201,14 +291,24 @@ EVERYTHING_HTTP_PORT = None
 HOTKEY = "win+space"
 MAX_RESULTS = 8
 SEARCH_DEBOUNCE_MS = 120
+RESULT_PAGE_SIZE = 50        # results pulled per page from a lazy result source
+RESULT_PREFETCH_ROWS = 8     # pull the next page when the viewport is this close to the end
 WINDOW_WIDTH = 820
 ENTRY_HEIGHT = 72
 RESULT_ITEM_HEIGHT = 56
 ICON_SIZE = 32
-
-# Detect installed browsers once so chooser can show options quickly
+ANIMATION_FRAME_MS = 16
+SHOW_ALPHA_STEPS = (0.25, 0.5, 0.8, 0.95)
+HIDE_ALPHA_STEPS = (0.6, 0.3, 0.0)
+ICON_CACHE_BUDGET_BYTES = 8 * 1024 * 1024  # decoded pixels kept as PhotoImages
+ICON_HINT_EXTRA = 8  # near-miss app matches whose icons are warmed ahead of time
+ICON_HINT_INTERVAL_S = 0.02  # gap between hinted icon loads; hints don't wait for the UI to go idle
+
+# Installed browsers are detected on first use (or by a background job
+# after startup) and cached for the rest of the session
 BROWSER_CANDIDATES = []
-import shutil
+_browsers_detected = False
+_browsers_lock = threading.Lock()
 
 def detect_browsers():
     """Populate BROWSER_CANDIDATES with available browsers (label, exe_or_None).
@@ -252,11 +352,17 @@ def detect_browsers():
     results.append(("System PDF app", "__START__"))
     BROWSER_CANDIDATES[:] = results
 
-# Run detection immediately (cheap filesystem checks)
-try:
-    detect_browsers()
-except Exception:
-    BROWSER_CANDIDATES = [("Default browser", None), ("System PDF app", "__START__")]
+def get_browser_candidates():
+    """Return the cached browser list, detecting it on the first call."""
+    global _browsers_detected
+    with _browsers_lock:
+        if not _browsers_detected:
+            try:
+                detect_browsers()
+            except Exception:
+                BROWSER_CANDIDATES[:] = [("Default browser", None), ("System PDF app", "__START__")]
+            _browsers_detected = True
+    return BROWSER_CANDIDATES
 
 def search_everything_cli(query, file_type="*", max_results=MAX_RESULTS):
     """Search using Everything's CLI (es.exe) if available"""
@@ -288,6 +394,17 @@ def search_everything_cli(query, file_type="*", max_results=MAX_RESULTS):
 
 def search_everything_http(query, file_type="*", max_results=MAX_RESULTS):
     """Search using Everything's HTTP server (alternative method)"""
+    return [e[0] for e in search_everything_http_entries(query, file_type, max_results)]
+
+def _filetime_to_epoch(value):
+    try:
+        return (int(value) - 116444736000000000) / 10**7
+    except (TypeError, ValueError):
+        return None
+
+def search_everything_http_entries(query, file_type="*", max_results=MAX_RESULTS):
+    """HTTP search returning (path, is_dir, size, mtime, seen_at) from the
+    type/size/date columns Everything already has."""
     # If port isn't configured, skip HTTP search
     if EVERYTHING_HTTP_PORT is None:
         return []
@@ -301,7 +418,10 @@ def search_everything_http(query, file_type="*", max_results=MAX_RESULTS):
         params = urllib.parse.urlencode({
             'search': search_query,
             'count': max_results,
-            'json': 1
+            'json': 1,
+            'path_column': 1,
+            'size_column': 1,
+            'date_modified_column': 1
         })
 
         url = f"http://localhost:{EVERYTHING_HTTP_PORT}/?{params}"
@@ -309,8 +429,17 @@ def search_everything_http(query, file_type="*", max_results=MAX_RESULTS):
         with urllib.request.urlopen(url, timeout=2) as response:
             data = json.loads(response.read().decode('utf-8'))
             results = data.get('results', [])
-            # Combine path and name for full path
-            return [os.path.join(r['path'], r['name']) for r in results if 'path' in r and 'name' in r]
+            now = time.time()
+            entries = []
+            for r in results:
+                if 'path' not in r or 'name' not in r:
+                    continue
+                is_dir = r.get('type') == 'folder'
+                size = None if is_dir or r.get('size') in (None, '') else int(r['size'])
+                # Combine path and name for full path
+                entries.append((os.path.join(r['path'], r['name']), is_dir, size,
+                                _filetime_to_epoch(r.get('date_modified')), now))
+            return entries
     except Exception as e:
         print(f"[everything] HTTP search failed: {e}")
         return []
@@ -319,7 +448,7 @@ def search_everything_http(query, file_type="*", max_results=MAX_RESULTS):
 
 def search_windows_index(query, file_type="*", max_results=MAX_RESULTS):
     """Search using Windows built-in Search Index via pywin32 (fast, no external tools)"""
-    if not HAS_PYWIN32:
+    if not has_pywin32():
         return []
     
     try:
@@ -350,24 +479,43 @@ def search_windows_index(query, file_type="*", max_results=MAX_RESULTS):
         print(f"[windows_index] search error: {e}")
         return []
 
+def file_backend_search(query, file_type="file", max_results=MAX_RESULTS, filters=None):
+    """Run the file backends in order of speed until one returns results.
+
+    Entries are (path, is_dir, size, mtime, seen_at); backends that only
+    return paths leave the metadata as None for refresh_file_meta. Only the
+    native walk applies filters itself; Everything gets the ext: part in its
+    own syntax and callers check the rest with file_entry_matches.
+    """
+    everything_query = query
+    if filters and filters.get("ext"):
+        everything_query = f"{query} ext:{';'.join(filters['ext'])}".strip()
+
+    # Each backend skips queries it already answered empty for a substring
+    # Try CLI first (faster and more reliable)
+    results = negative_cached("everything", query, file_type, filters, lambda: [
+        (p, None, None, None, None) for p in search_everything_cli(everything_query, file_type, max_results)])
+    
+    # Fallback to HTTP if CLI fails and port is set
+    if not results and EVERYTHING_HTTP_PORT is not None:
+        results = negative_cached("everything_http", query, file_type, filters,
+                                  lambda: search_everything_http_entries(everything_query, file_type, max_results))
+    
+    # Fallback to Windows Index if available (it needs a name to match)
+    if not results and query:
+        results = negative_cached("windows_index", query, file_type, filters, lambda: [
+            (p, None, None, None, None) for p in search_windows_index(query, file_type, max_results)])
+    
+    # Final fallback to native Python search
+    if not results:
+        results = negative_cached("native", query, file_type, filters,
+                                  lambda: native_file_search_entries(query, file_type, max_results, filters))
+    return results
+
 def threaded_everything_search(query, file_type="file", callback=None):
     """Search Everything in a background thread"""
     def _search():
-        # Try CLI first (faster and more reliable)
-        results = search_everything_cli(query, file_type, MAX_RESULTS)
-        
-        # Fallback to HTTP if CLI fails and port is set
-        if not results and EVERYTHING_HTTP_PORT is not None:
-            results = search_everything_http(query, file_type, MAX_RESULTS)
-        
-        # Fallback to Windows Index if available
-        if not results:
-            results = search_windows_index(query, file_type, MAX_RESULTS)
-        
-        # Final fallback to native Python search
-        if not results:
-            results = native_file_search(query, file_type, MAX_RESULTS)
-        
+        results = [e[0] for e in file_backend_search(query, file_type, MAX_RESULTS)]
         if callback:
             search_window.after(0, lambda: callback(results))
     
@@ -375,80 +523,1032 @@ def threaded_everything_search(query, file_type="file", callback=None):
 
 def native_file_search(query, file_type="*", max_results=MAX_RESULTS):
     """Fallback native Python file search (slower but always works)"""
-    if not query.strip():
+    return [e[0] for e in native_file_search_entries(query, file_type, max_results)]
+
+def native_file_search_entries(query, file_type="*", max_results=MAX_RESULTS, filters=None):
+    """Breadth-first scandir walk of the common user paths; entries keep the
+    is_dir/size/mtime the walk already had: (path, is_dir, size, mtime, seen_at)."""
+    needle = query.strip().lower()
+    if not needle and not filters:
         return []
-    
-    patterns = {
-        "folder": None,
-        "file": "*"
-    }
-    pattern = patterns.get(file_type, "*")
+    want_dirs = file_type == "folder"
     
     # Limit search to common user paths to improve speed (change to get_all_drives() for full but slower)
-    search_paths = get_search_paths()
+    pending = deque(p for p in get_search_paths() if os.path.exists(p))
     results = []
-    
-    for path in search_paths:
-        if not os.path.exists(path):
-            continue
-        
-        try:
-            for root, dirs, files in os.walk(path):
-                try:
-                    if file_type == "folder":
-                        for d in dirs:
-                            if query.lower() in d.lower():
-                                results.append(os.path.join(root, d))
-                    else:
-                        for f in files:
-                            if pattern and not fnmatch.fnmatch(f.lower(), pattern.lower()):
-                                continue
-                            if query.lower() in f.lower():
-                                results.append(os.path.join(root, f))
-                    
-                    if len(results) >= max_results:
-                        return results[:max_results]
-                except Exception:
+    while pending:
+        rows, subdirs = _scan_dir(pending.popleft())
+        now = time.time()
+        for path, name, is_dir, size, mtime, _ in rows:
+            if bool(is_dir) == want_dirs and needle in name.lower():
+                entry = (path, bool(is_dir), size, mtime, now)
+                if filters and not file_entry_matches(entry, filters):
                     continue
-        except Exception:
+                results.append(entry)
+                if len(results) >= max_results:
+                    return results
+        pending.extend(subdirs)
+    return results
+
+# ========== FILE QUERY FILTERS ==========
+
+# `ext:pdf,docx size:>10mb modified:<7d report` — filter tokens anywhere in
+# a file query, the rest is the name substring. Filters become SQL
+# predicates on indexed columns (ext, size, mtime) for the local index and
+# a per-entry check for the other backends. size: and modified: take <, >,
+# <=, >= or an a..b range; ages use h/d/w/m/y, dates are YYYY-MM-DD and
+# cover the whole day. A bare age (modified:7d) means "within the last 7d".
+FILE_FILTER_RE = re.compile(r"(?<!\S)(ext|size|modified):(\S+)", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "kb": 1024, "m": 1024**2, "mb": 1024**2,
+               "g": 1024**3, "gb": 1024**3}
+_AGE_UNITS = {"h": 3600, "d": 86400, "w": 7 * 86400, "m": 30 * 86400, "y": 365 * 86400}
+
+def _parse_size(text):
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)([a-z]*)", text.lower())
+    if not m or m.group(2) not in _SIZE_UNITS:
+        raise ValueError(f"bad size {text!r}")
+    return int(float(m.group(1)) * _SIZE_UNITS[m.group(2)])
+
+_AGE_RE = re.compile(r"(\d+(?:\.\d+)?)([hdwmy])")
+
+def _parse_when(text, now):
+    """(earliest, latest) epoch of an age like 7d (a single instant that long
+    ago) or a YYYY-MM-DD date (its whole local day)."""
+    m = _AGE_RE.fullmatch(text.lower())
+    if m:
+        when = now - float(m.group(1)) * _AGE_UNITS[m.group(2)]
+        return when, when
+    day = time.strptime(text, "%Y-%m-%d")
+    start = time.mktime(day)
+    # mktime normalizes day + 1, so month ends and DST changes come out right
+    end = time.mktime((day.tm_year, day.tm_mon, day.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+    return start, end - 0.001
+
+def _parse_modified(spec, now):
+    """(low, high) mtime bounds for a modified: spec. Ages count backwards,
+    so <7d (younger) is a lower bound on mtime while <2026-01-15 is an upper
+    one; a..b ranges come out ordered whichever way they were written."""
+    def is_age(t):
+        return _AGE_RE.fullmatch(t.lower()) is not None
+
+    def open_bound(t, newer, strict=False):
+        low, high = _parse_when(t, now)
+        if strict:  # >2026-01-15 starts after that day, <2026-01-15 ends before it
+            low, high = high, low
+        return (low, None) if newer != is_age(t) else (None, high)
+
+    if ".." in spec:
+        first, last = spec.split("..", 1)
+        if first and last:
+            spans = [_parse_when(first, now), _parse_when(last, now)]
+            return min(s[0] for s in spans), max(s[1] for s in spans)
+        if not first and not last:
+            raise ValueError(f"bad range {spec!r}")
+        return open_bound(first, True) if first else open_bound(last, False)
+    for op in ("<=", ">=", "<", ">"):
+        if spec.startswith(op):
+            return open_bound(spec[len(op):], op[0] == ">", len(op) == 1)
+    if is_age(spec):
+        return _parse_when(spec, now)[0], None
+    return _parse_when(spec, now)
+
+def _parse_range(spec, parse):
+    """(low, high) bounds for <x, >x, <=x, >=x, a..b or an exact x."""
+    if ".." in spec:
+        low, high = spec.split("..", 1)
+        low, high = (parse(low) if low else None), (parse(high) if high else None)
+        if low is not None and high is not None and low > high:
+            low, high = high, low
+        return low, high
+    for op in ("<=", ">=", "<", ">"):
+        if spec.startswith(op):
+            value = parse(spec[len(op):])
+            return (None, value) if op[0] == "<" else (value, None)
+    value = parse(spec)
+    return value, value
+
+def parse_file_filters(query, now=None):
+    """Split a query into (name text, filters); unparseable tokens stay in the
+    text. filters["spec"] keeps the parsed tokens as typed, a key that stays
+    stable while relative dates resolve to a new instant on every parse."""
+    now = now or time.time()
+    filters = {}
+    tokens = []
+    def take(m):
+        key, spec = m.group(1).lower(), m.group(2)
+        try:
+            if key == "ext":
+                filters["ext"] = [e.lstrip(".").lower() for e in spec.split(",") if e.strip(".")]
+            elif key == "size":
+                filters["size"] = _parse_range(spec, _parse_size)
+            else:
+                filters["modified"] = _parse_modified(spec, now)
+            tokens.append(f"{key}:{spec.lower()}")
+            return ""
+        except ValueError:
+            return m.group(0)
+    text = FILE_FILTER_RE.sub(take, query)
+    if tokens:
+        filters["spec"] = " ".join(sorted(tokens))
+    return " ".join(text.split()), filters
+
+def file_filter_sql(filters):
+    """WHERE fragments and parameters for the indexed columns."""
+    clauses, params = [], []
+    if filters.get("ext"):
+        clauses.append(f"ext IN ({','.join('?' * len(filters['ext']))})")
+        params.extend(filters["ext"])
+    for key, column in (("size", "size"), ("modified", "mtime")):
+        low, high = filters.get(key, (None, None))
+        if low is not None:
+            clauses.append(f"{column} >= ?")
+            params.append(low)
+        if high is not None:
+            clauses.append(f"{column} <= ?")
+            params.append(high)
+    return clauses, params
+
+def file_entry_matches(entry, filters):
+    """Check an (path, is_dir, size, mtime, seen_at) entry against filters."""
+    path, is_dir, size, mtime, _ = entry
+    if filters.get("ext") and (is_dir or os.path.splitext(path)[1][1:].lower() not in filters["ext"]):
+        return False
+    for key, value in (("size", size), ("modified", mtime)):
+        low, high = filters.get(key, (None, None))
+        if low is None and high is None:
             continue
-    
-    return results[:max_results]
+        if value is None or (low is not None and value < low) or (high is not None and value > high):
+            return False
+    return True
+
+# ========== NEGATIVE RESULT CACHE ==========
+
+# File backends match substrings, so a query that found nothing makes every
+# query containing it find nothing too ("xyzq" -> "xyzqa", "xyzq b"). Empty
+# answers are remembered per backend, mode and filter spec, and later queries
+# that contain one are answered without touching the backend. Entries for the
+# local index (and folder index) live until the index changes under them;
+# live backends (Everything, Windows Search, the walk) see the disk change
+# underneath them, so theirs expire after NEG_CACHE_LIVE_TTL_S instead.
+NEG_CACHE_PER_KEY = 128
+NEG_CACHE_KEYS = 64
+NEG_CACHE_LIVE_TTL_S = 30.0
+NEG_CACHE_INDEX_BACKENDS = ("index", "folders")
+# Everything's operators and wildcards break the substring reasoning
+_NEG_CACHE_UNSAFE = re.compile(r'[|!<>"*?:]')
+_index_generation = 0
+_negative_cache = OrderedDict()  # (backend, mode, filter spec) -> OrderedDict(text -> stamp)
+_negative_epochs = {}            # backend -> times its entries were dropped
+_negative_stats = {}             # backend -> [hits, lookups]
+_negative_lock = threading.Lock()
+
+def forget_negatives(backends, only=None):
+    """Drop the remembered empty answers of backends (those whose key
+    satisfies only(key), if given); searches already running for them won't
+    store their answer afterwards."""
+    with _negative_lock:
+        for key in [k for k in _negative_cache if k[0] in backends and (only is None or only(k))]:
+            del _negative_cache[key]
+        for backend in backends:
+            _negative_epochs[backend] = _negative_epochs.get(backend, 0) + 1
+
+def bump_index_generation(reason=""):
+    """The local index changed: forget the empty answers it gave."""
+    global _index_generation
+    _index_generation += 1
+    forget_negatives(NEG_CACHE_INDEX_BACKENDS)
+    if reason:
+        print(f"[negcache] index generation {_index_generation} ({reason})")
+
+def _negative_key(backend, mode, filters):
+    filters = filters or {}
+    spec = filters.get("spec")
+    if spec is None:  # built by hand rather than parsed from a query
+        spec = repr(sorted(filters.items()))
+    return backend, mode, spec
+
+def _known_empty(backend, key, text, now):
+    with _negative_lock:
+        stats = _negative_stats.setdefault(backend, [0, 0])
+        stats[1] += 1
+        known = _negative_cache.get(key)
+        if known:
+            live = backend not in NEG_CACHE_INDEX_BACKENDS
+            for empty, stamp in known.items():
+                if empty in text and not (live and now - stamp > NEG_CACHE_LIVE_TTL_S):
+                    known.move_to_end(empty)
+                    _negative_cache.move_to_end(key)
+                    stats[0] += 1
+                    return True
+    return False
+
+def negative_cached(backend, text, mode, filters, search):
+    """Run search() unless a cached empty answer for a substring of text
+    already rules it out; empty answers ([] but not None) are remembered."""
+    if not text or _NEG_CACHE_UNSAFE.search(text):
+        return search()
+    key = _negative_key(backend, mode, filters)
+    now = time.time()
+    if _known_empty(backend, key, text, now):
+        return []
+    epoch = _negative_epochs.get(backend, 0)
+    results = search()
+    if results is not None and not results:
+        with _negative_lock:
+            if _negative_epochs.get(backend, 0) != epoch:
+                return results  # answered from data that has changed since
+            known = _negative_cache.get(key)
+            if known is None:
+                known = _negative_cache[key] = OrderedDict()
+                while len(_negative_cache) > NEG_CACHE_KEYS:
+                    _negative_cache.popitem(last=False)
+            _negative_cache.move_to_end(key)
+            known[text] = now
+            known.move_to_end(text)
+            while len(known) > NEG_CACHE_PER_KEY:
+                known.popitem(last=False)
+    return results
+
+def negative_cache_report():
+    with _negative_lock:
+        parts = [f"{name} {hits}/{lookups} ({100 * hits / lookups:.0f}%)"
+                 for name, (hits, lookups) in _negative_stats.items() if lookups]
+        size = sum(len(v) for v in _negative_cache.values())
+    return f"{'; '.join(parts) or 'no lookups yet'} · {size} entries, generation {_index_generation}"
 
 # ========== LOCAL SQLITE DB SEARCH (OPTIONAL) ==========
 
-def db_search(query, mode="file", limit=MAX_RESULTS):
+def db_search(query, mode="file", limit=MAX_RESULTS, offset=0):
+    return [r[0] for r in db_search_entries(query, mode, limit, offset) or []]
+
+def db_search_entries(query, mode="file", limit=MAX_RESULTS, offset=0, filters=None, db_path=None):
+    """Like db_search, but rows are (path, is_dir, size, mtime, indexed_at).
+    filters (see parse_file_filters) become predicates on indexed columns.
+    Returns None (not "no hits") when the index can't be queried."""
+    db_path = db_path or DB_PATH
     try:
-        if not os.path.exists(DB_PATH):
+        if not os.path.exists(db_path):
             return []
-        conn = sqlite3.connect(DB_PATH)
+        conn = sqlite3.connect(db_path)
         cur = conn.cursor()
-        q = f"%{query}%"
-        if mode == "folder":
-            cur.execute("SELECT path FROM files WHERE is_directory=1 AND name LIKE ? LIMIT ?", (q, limit))
-        else:
-            cur.execute("SELECT path FROM files WHERE is_directory=0 AND name LIKE ? LIMIT ?", (q, limit))
-        rows = cur.fetchall()
-        return [r[0] for r in rows]
-    except Exception:
-        return []
+        clauses, params = file_filter_sql(filters or {})
+        if query:
+            clauses.append("name LIKE ?")
+            params.append(f"%{query}%")
+        where = " AND ".join(["is_directory=?"] + clauses)
+        # Date-filtered queries list the newest first (served by the mtime indexes)
+        order = " ORDER BY mtime DESC" if filters and "modified" in filters else ""
+        cur.execute(f"SELECT path, is_directory, size, mtime, indexed_at FROM files "
+                    f"WHERE {where}{order} LIMIT ? OFFSET ?",
+                    [1 if mode == "folder" else 0] + params + [limit, offset])
+        return [(p, bool(d), size, mtime, at) for p, d, size, mtime, at in cur.fetchall()]
+    except sqlite3.Error as e:
+        print(f"[db] search failed: {e}")
+        return None
     finally:
         try:
             conn.close()
         except Exception:
             pass
 
+FILE_META_MAX_AGE_S = 6 * 3600  # index metadata older than this is re-statted before display
+
+def refresh_file_meta(entries, write_back=False):
+    """Batch-stat the entries whose metadata is unknown or stale and return
+    the list with fresh values; files that no longer exist are dropped.
+
+    With write_back the refreshed rows (and removals) are written to the
+    index in one transaction. Called from worker threads only, never on the
+    Tk thread.
+    """
+    now = time.time()
+    fresh, updates, gone = [], [], []
+    retyped = remetered = False
+    for entry in entries:
+        path, is_dir, size, mtime, seen_at = entry
+        if is_dir is not None and mtime is not None and seen_at is not None \
+                and now - seen_at < FILE_META_MAX_AGE_S:
+            fresh.append(entry)
+            continue
+        try:
+            st = os.stat(path)
+        except OSError:
+            gone.append((path,))
+            continue
+        was = entry
+        is_dir = stat.S_ISDIR(st.st_mode)
+        entry = (path, is_dir, None if is_dir else st.st_size, st.st_mtime, now)
+        retyped = retyped or was[1] != is_dir
+        remetered = remetered or was[2] != entry[2] or was[3] != entry[3]
+        fresh.append(entry)
+        updates.append((int(is_dir), entry[2], entry[3], now, path))
+    if write_back and (updates or gone):
+        try:
+            conn = sqlite3.connect(DB_PATH, timeout=5)
+            try:
+                with conn:
+                    conn.executemany("UPDATE files SET is_directory=?, size=?, mtime=?, indexed_at=? "
+                                     "WHERE path=?", updates)
+                    conn.executemany("DELETE FROM files WHERE path=?", gone)
+            finally:
+                conn.close()
+            # Removals can't turn an empty answer into a hit. A row that became
+            # a folder (or file) can match the other mode; new size/mtime
+            # values only matter to the size:/modified: entries
+            if retyped:
+                forget_negatives(NEG_CACHE_INDEX_BACKENDS)
+            elif remetered:
+                forget_negatives(NEG_CACHE_INDEX_BACKENDS,
+                                 lambda key: "size" in key[2] or "modified" in key[2])
+        except sqlite3.Error as e:
+            print(f"[db] metadata refresh not saved: {e}")
+    return fresh
+
 def threaded_db_search(query, mode, callback):
     def _run():
         paths = db_search(query, mode, MAX_RESULTS)
         search_window.after(0, lambda: callback(paths))
     threading.Thread(target=_run, daemon=True).start()
 
+# ========== FOLDER INDEX ==========
+
+# Folder-mode queries go to a separate directory index instead of scanning
+# every file row: `folders` holds one compact row per directory (name,
+# parent id, direct child count, mtime) and `folder_trigrams` maps each
+# lower-cased name trigram to folder ids. It is rebuilt from `files` after
+# each indexing run and swapped in atomically. folder_gram_counts lets a
+# lookup intersect only the rarest trigrams of the query.
+FOLDER_TRIGRAM_BATCH = 50000
+FOLDER_LOOKUP_GRAMS = 2
+FOLDER_SORT_CANDIDATES = 2000  # matches (in id order) ranked by size; later ones page in id order
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def build_folder_index(db_path=None, pace=None):
+    """Rebuild folders/folder_trigrams from the files table; returns the folder count."""
+    db_path = db_path or DB_PATH
+    started = time.time()
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        dirs = conn.execute("SELECT path, mtime FROM files WHERE is_directory=1 ORDER BY path").fetchall()
+        ids = {path: i for i, (path, _) in enumerate(dirs, 1)}
+        children = [0] * (len(dirs) + 1)
+        for n, (path,) in enumerate(conn.execute("SELECT path FROM files")):
+            parent = ids.get(os.path.dirname(path))
+            if parent is not None:
+                children[parent] += 1
+            if pace and n % FOLDER_TRIGRAM_BATCH == 0:
+                pace()
+
+        conn.execute("DROP TABLE IF EXISTS folders_new")
+        conn.execute("DROP TABLE IF EXISTS folder_trigrams_new")
+        conn.execute("DROP TABLE IF EXISTS folder_gram_counts_new")
+        conn.execute("CREATE TABLE folders_new (id INTEGER PRIMARY KEY, parent INTEGER, name TEXT, "
+                     "children INTEGER, mtime REAL, indexed_at REAL)")
+        conn.execute("CREATE TABLE folder_trigrams_new (gram TEXT, folder_id INTEGER, "
+                     "PRIMARY KEY (gram, folder_id)) WITHOUT ROWID")
+        rows, grams = [], []
+        gram_counts = {}
+        for path, mtime in dirs:
+            folder_id = ids[path]
+            parent = ids.get(os.path.dirname(path))
+            # Roots keep their full path as the name so paths can be rebuilt
+            name = os.path.basename(path) if parent is not None else path
+            rows.append((folder_id, parent, name, children[folder_id], mtime, started))
+            for g in _trigrams(os.path.basename(path).lower()):
+                grams.append((g, folder_id))
+                gram_counts[g] = gram_counts.get(g, 0) + 1
+            if len(grams) >= FOLDER_TRIGRAM_BATCH:
+                with conn:
+                    conn.executemany("INSERT OR IGNORE INTO folder_trigrams_new VALUES (?, ?)", grams)
+                grams = []
+                if pace:
+                    pace()
+        with conn:
+            conn.executemany("INSERT INTO folders_new VALUES (?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany("INSERT OR IGNORE INTO folder_trigrams_new VALUES (?, ?)", grams)
+            conn.execute("CREATE TABLE folder_gram_counts_new (gram TEXT PRIMARY KEY, n INTEGER) WITHOUT ROWID")
+            conn.executemany("INSERT INTO folder_gram_counts_new VALUES (?, ?)", gram_counts.items())
+        with _index_merge_lock, conn:
+            for table in ("folders", "folder_trigrams", "folder_gram_counts"):
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+                conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+        bump_index_generation("folder index rebuilt")
+        print(f"[indexer] folder index: {len(rows)} folders ({time.time() - started:.1f}s)")
+        return len(rows)
+    except Exception as e:
+        print(f"[indexer] folder index failed: {e}")
+        return 0
+    finally:
+        conn.close()
+
+def has_folder_index(db_path=None):
+    db_path = db_path or DB_PATH
+    if not os.path.exists(db_path):
+        return False
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            return conn.execute("SELECT 1 FROM folders LIMIT 1").fetchone() is not None
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False
+
+def _folder_paths(conn, folder_ids):
+    """Rebuild full paths by walking parent ids (memoized per call)."""
+    known = {}
+    def path_of(folder_id):
+        if folder_id not in known:
+            parent, name = conn.execute("SELECT parent, name FROM folders WHERE id=?", (folder_id,)).fetchone()
+            known[folder_id] = name if parent is None else os.path.join(path_of(parent), name)
+        return known[folder_id]
+    return [path_of(i) for i in folder_ids]
+
+def folder_search_entries(query, limit=MAX_RESULTS, offset=0, filters=None, db_path=None):
+    """Folder hits as (path, True, None, mtime, indexed_at), biggest folders
+    first among the first FOLDER_SORT_CANDIDATES matches; None if there is no
+    folder index yet. mtime is as of the last folder-index build."""
+    filters = filters or {}
+    if filters.get("ext") or "size" in filters:
+        return []  # folders have neither
+    db_path = db_path or DB_PATH
+    if not os.path.exists(db_path):
+        return None
+    try:
+        conn = sqlite3.connect(db_path)
+    except sqlite3.Error:
+        return None
+    try:
+        needle = query.lower()
+        clauses, params = file_filter_sql({"modified": filters["modified"]} if "modified" in filters else {})
+        grams = list(_trigrams(needle))
+        if grams:
+            counts = dict(conn.execute(f"SELECT gram, n FROM folder_gram_counts WHERE gram IN "
+                                       f"({','.join('?' * len(grams))})", grams).fetchall())
+            if len(counts) < len(grams):
+                return []  # some trigram occurs in no folder name
+            # Folders holding the rarest trigrams of the query; LIKE below
+            # confirms the whole substring
+            rarest = sorted(grams, key=counts.get)[:FOLDER_LOOKUP_GRAMS]
+            clauses.append("id IN (SELECT folder_id FROM folder_trigrams WHERE gram IN "
+                           f"({','.join('?' * len(rarest))}) GROUP BY folder_id HAVING COUNT(*) = ?)")
+            params.extend(rarest)
+            params.append(len(rarest))
+        if needle:
+            clauses.append("name LIKE ?")
+            params.append(f"%{query}%")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        # Sorting every match by size costs more than the lookup for common
+        # names, so only a bounded head of the matches is sorted
+        rows = []
+        if offset < FOLDER_SORT_CANDIDATES:
+            rows = conn.execute(f"SELECT id, mtime, indexed_at FROM (SELECT id, mtime, indexed_at, children "
+                                f"FROM folders {where} ORDER BY id LIMIT ?) ORDER BY children DESC, id "
+                                f"LIMIT ? OFFSET ?", params + [FOLDER_SORT_CANDIDATES, limit, offset]).fetchall()
+        if len(rows) < limit and offset + len(rows) >= FOLDER_SORT_CANDIDATES:
+            rows += conn.execute(f"SELECT id, mtime, indexed_at FROM folders {where} ORDER BY id LIMIT ? OFFSET ?",
+                                 params + [limit - len(rows), max(offset, FOLDER_SORT_CANDIDATES)]).fetchall()
+        paths = _folder_paths(conn, [r[0] for r in rows])
+        return [(p, True, None, r[1], r[2]) for p, r in zip(paths, rows)]
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+
+# ========== BACKGROUND JOB SCHEDULER ==========
+
+JOB_PRIORITY_HIGH = 0
+JOB_PRIORITY_NORMAL = 1
+JOB_PRIORITY_LOW = 2
+BACKGROUND_DUTY_CYCLE = 0.25  # share of wall time background work may use, across all threads
+BACKGROUND_SLICE_S = 0.05     # work slice before the duty-cycle sleep kicks in
+USER_IDLE_RESUME_S = 1.5      # quiet time after the last keystroke before jobs resume
+SCHEDULER_STATE_PATH = data_path("scheduler_state.json")
+_window_visible = False
+_last_user_activity = 0.0
+_background_thread_state = threading.local()
+_background_budget_lock = threading.Lock()
+_background_resume_at = 0.0   # monotonic time until which the shared work budget is spent
+_IOPRIO_SET_SYSCALLS = {"x86_64": 251, "amd64": 251, "aarch64": 30, "arm64": 30, "i686": 289, "i386": 289}
+
+def note_user_activity():
+    global _last_user_activity
+    _last_user_activity = time.monotonic()
+
+def ui_is_busy():
+    """True while the launcher is on screen or the user typed recently."""
+    return _window_visible or (time.monotonic() - _last_user_activity) < USER_IDLE_RESUME_S
+
+def lower_thread_priority():
+    """Drop the calling thread to background CPU and I/O priority (once per thread).
+
+    I/O priority is lowered on Windows and Linux; other POSIX systems only get nice.
+    """
+    if getattr(_background_thread_state, "lowered", False):
+        return
+    _background_thread_state.lowered = True
+    try:
+        if os.name == "nt":
+            # THREAD_MODE_BACKGROUND_BEGIN lowers both CPU and I/O priority
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), 0x00010000)
+        else:
+            tid = threading.get_native_id()
+            os.setpriority(os.PRIO_PROCESS, tid, 19)
+            nr = _IOPRIO_SET_SYSCALLS.get(os.uname().machine.lower())
+            if sys.platform.startswith("linux") and nr:
+                # ioprio_set(IOPRIO_WHO_PROCESS, tid, IOPRIO_CLASS_IDLE)
+                ctypes.CDLL(None, use_errno=True).syscall(nr, 1, tid, 3 << 13)
+    except Exception:
+        pass
+
+class JobContext:
+    """Handed to each job: resume point, checkpoint saving and cooperative pacing."""
+
+    def __init__(self, scheduler, name, checkpoint):
+        self.scheduler = scheduler
+        self.name = name
+        self.checkpoint = checkpoint
+        self._lock = threading.Lock()
+
+    def save(self, checkpoint):
+        with self._lock:
+            self.checkpoint = checkpoint
+            self.scheduler.save_checkpoint(self.name, checkpoint)
+
+    def pace(self):
+        """Call between units of work; safe from any worker thread of the job.
+
+        Blocks while the UI is busy. Work time from every background thread
+        is charged to one shared budget, so parallel walkers together stay
+        near BACKGROUND_DUTY_CYCLE instead of each taking that share.
+        """
+        global _background_resume_at
+        lower_thread_priority()
+        state = _background_thread_state
+        now = time.monotonic()
+        if ui_is_busy():
+            while ui_is_busy():
+                time.sleep(0.1)
+            state.slice_start = time.monotonic()
+            return
+        start = getattr(state, "slice_start", None)
+        if start is None:
+            state.slice_start = now
+            return
+        ran = now - start
+        if ran >= BACKGROUND_SLICE_S or now < _background_resume_at:
+            with _background_budget_lock:
+                _background_resume_at = (max(_background_resume_at, now)
+                                         + ran * (1 - BACKGROUND_DUTY_CYCLE) / BACKGROUND_DUTY_CYCLE)
+                resume_at = _background_resume_at
+            time.sleep(max(0.0, resume_at - time.monotonic()))
+            state.slice_start = time.monotonic()
+
+JOB_LANE_DEFAULT = "jobs"
+JOB_LANE_ICONS = "icons"
+
+class JobScheduler:
+    """Runs background jobs one at a time per lane, highest priority first.
+
+    A job is `fn(ctx)`; it calls ctx.pace() between units of work and
+    ctx.save(...) with a JSON-serialisable checkpoint. Checkpoints survive
+    restarts and are cleared when a job completes. Jobs are never
+    pre-empted, so short latency-sensitive work (icon warming) gets its own
+    lane and thread instead of waiting behind an hours-long indexing run.
+    """
+
+    def __init__(self, state_path=SCHEDULER_STATE_PATH):
+        self.state_path = state_path
+        self._queues = {}   # lane -> heap of (priority, counter, name, fn)
+        self._counter = 0
+        self._names = set()
+        self._cond = threading.Condition()
+        self._state_lock = threading.Lock()
+        self._checkpoints = self._load_state()
+        self._threads = {}  # lane -> worker thread, once started
+        self._started = False
+
+    def _load_state(self):
+        try:
+            if os.path.exists(self.state_path):
+                with open(self.state_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except Exception:
+            pass
+        return {}
+
+    def _write_state(self):
+        try:
+            tmp = self.state_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._checkpoints, f)
+            os.replace(tmp, self.state_path)
+        except Exception as e:
+            print(f"[scheduler] could not save state: {e}")
+
+    def has_checkpoint(self, name):
+        return name in self._checkpoints
+
+    def save_checkpoint(self, name, checkpoint):
+        with self._state_lock:
+            if checkpoint is None:
+                self._checkpoints.pop(name, None)
+            else:
+                self._checkpoints[name] = checkpoint
+            self._write_state()
+
+    def submit(self, name, fn, priority=JOB_PRIORITY_NORMAL, lane=JOB_LANE_DEFAULT):
+        """Queue a job unless one with the same name is already queued or running."""
+        with self._cond:
+            if name in self._names:
+                return False
+            self._names.add(name)
+            heapq.heappush(self._queues.setdefault(lane, []), (priority, self._counter, name, fn))
+            self._counter += 1
+            if self._started:
+                self._start_lane(lane)
+            self._cond.notify_all()
+        return True
+
+    def start(self):
+        with self._cond:
+            self._started = True
+            for lane in [JOB_LANE_DEFAULT, *self._queues]:
+                self._start_lane(lane)
+
+    def _start_lane(self, lane):
+        if lane not in self._threads:
+            self._queues.setdefault(lane, [])
+            thread = threading.Thread(target=self._run, args=(lane,), name=f"yoi-scheduler-{lane}", daemon=True)
+            self._threads[lane] = thread
+            thread.start()
+
+    def _run(self, lane):
+        lower_thread_priority()
+        jobs = self._queues[lane]
+        while True:
+            with self._cond:
+                while not jobs:
+                    self._cond.wait()
+                priority, _, name, fn = heapq.heappop(jobs)
+            ctx = JobContext(self, name, self._checkpoints.get(name))
+            ctx.pace()
+            started = time.time()
+            try:
+                if ctx.checkpoint is not None:
+                    print(f"[scheduler] resuming {name} from checkpoint")
+                fn(ctx)
+                self.save_checkpoint(name, None)
+                print(f"[scheduler] {name} finished in {time.time() - started:.1f}s")
+            except Exception as e:
+                print(f"[scheduler] {name} failed: {e}")
+            finally:
+                with self._cond:
+                    self._names.discard(name)
+
+scheduler = JobScheduler()
+
+# ========== FILE INDEXER (PER-DEVICE SHARDS) ==========
+
+# Walker threads per device class. Rotational and remote media thrash when
+# several threads seek at once, so they get a single walker.
+DEVICE_CONCURRENCY = {
+    "ssd": 8,
+    "fixed": 4,
+    "hdd": 1,
+    "removable": 1,
+    "network": 1,
+}
+INDEX_BATCH_SIZE = 5000
+INDEX_SKIP_DIRS = {"$recycle.bin", "system volume information", "$windows.~bt", "$windows.~ws"}
+_index_run_lock = threading.Lock()
+_index_merge_lock = threading.Lock()
+
+def _ensure_index_schema(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, name TEXT, is_directory INTEGER, "
+                 "size INTEGER, mtime REAL, indexed_at REAL, ext TEXT)")
+    have = {row[1] for row in conn.execute("PRAGMA table_info(files)")}
+    for column, decl in (("size", "INTEGER"), ("mtime", "REAL"), ("indexed_at", "REAL"), ("ext", "TEXT")):
+        if column not in have:
+            conn.execute(f"ALTER TABLE files ADD COLUMN {column} {decl}")
+    if "ext" not in have:
+        rows = conn.execute("SELECT path, name FROM files WHERE is_directory=0").fetchall()
+        conn.executemany("UPDATE files SET ext=? WHERE path=?", [(_file_ext(n), p) for p, n in rows])
+    # Backing indexes for the ext:/size:/modified: query filters
+    conn.execute("CREATE INDEX IF NOT EXISTS files_ext_mtime ON files (ext, mtime)")
+    conn.execute("CREATE INDEX IF NOT EXISTS files_mtime ON files (mtime)")
+    conn.execute("CREATE INDEX IF NOT EXISTS files_size ON files (size)")
+
+def migrate_index_db(db_path=None):
+    """Bring an existing index up to the current schema; True while it still
+    holds rows from before the metadata columns, whose values stay unknown
+    until a re-index replaces them."""
+    db_path = db_path or DB_PATH
+    if not os.path.exists(db_path):
+        return False
+    try:
+        conn = sqlite3.connect(db_path, timeout=30)
+        try:
+            with conn:
+                _ensure_index_schema(conn)
+            stale = conn.execute(
+                "SELECT EXISTS(SELECT 1 FROM files WHERE indexed_at IS NULL)").fetchone()[0]
+            if stale:
+                print("[db] index has rows without file metadata; re-indexing")
+                return True
+            return False
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"[db] index migration failed: {e}")
+        return False
+
+def maintain_index(ctx):
+    """Scheduler job: migrate the index schema off the startup path, then
+    build, resume or refresh whatever is missing or stale."""
+    ctx.pace()
+    missing = not os.path.exists(DB_PATH)
+    stale = migrate_index_db()
+    if missing or stale or ctx.checkpoint is not None:
+        return index_files(ctx=ctx)
+    if not has_folder_index():
+        build_folder_index(pace=ctx.pace)
+
+def _file_ext(name):
+    return os.path.splitext(name)[1][1:].lower() or None
+
+def _windows_device_class(root):
+    """Classify a drive root via GetDriveType and the storage seek-penalty query."""
+    drive = os.path.splitdrive(root)[0] or root[:2]
+    drive_type = ctypes.windll.kernel32.GetDriveTypeW(drive + "\\")
+    if drive_type == 4:  # DRIVE_REMOTE
+        return "network"
+    if drive_type in (2, 5):  # DRIVE_REMOVABLE, DRIVE_CDROM
+        return "removable"
+    if drive_type != 3:  # DRIVE_FIXED
+        return "hdd"
+
+    class STORAGE_PROPERTY_QUERY(ctypes.Structure):
+        _fields_ = [("PropertyId", ctypes.c_int),
+                    ("QueryType", ctypes.c_int),
+                    ("AdditionalParameters", ctypes.c_byte * 1)]
+
+    class DEVICE_SEEK_PENALTY_DESCRIPTOR(ctypes.Structure):
+        _fields_ = [("Version", wintypes.DWORD),
+                    ("Size", wintypes.DWORD),
+                    ("IncursSeekPenalty", ctypes.c_ubyte)]
+
+    kernel32 = ctypes.windll.kernel32
+    kernel32.CreateFileW.restype = wintypes.HANDLE
+    handle = kernel32.CreateFileW(f"\\\\.\\{drive}", 0, 3, None, 3, 0, None)
+    if not handle or handle == wintypes.HANDLE(-1).value:
+        return "fixed"
+    try:
+        query = STORAGE_PROPERTY_QUERY(7, 0)  # StorageDeviceSeekPenaltyProperty, PropertyStandardQuery
+        desc = DEVICE_SEEK_PENALTY_DESCRIPTOR()
+        returned = wintypes.DWORD()
+        ok = kernel32.DeviceIoControl(handle, 0x002D1400,  # IOCTL_STORAGE_QUERY_PROPERTY
+                                      ctypes.byref(query), ctypes.sizeof(query),
+                                      ctypes.byref(desc), ctypes.sizeof(desc),
+                                      ctypes.byref(returned), None)
+        if not ok:
+            return "fixed"
+        return "hdd" if desc.IncursSeekPenalty else "ssd"
+    finally:
+        kernel32.CloseHandle(handle)
+
+def _subtree_range(root):
+    """[low, high) bounds covering exactly the paths below root, for a range
+    scan on the path column; sibling prefixes (/home/me2 for /home/me) fall outside."""
+    prefix = root if root.endswith(os.sep) else root + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+def _posix_device_class(root):
+    """Classify a mount via /proc/mounts and /sys/dev/block/*/queue/rotational."""
+    try:
+        best, fstype = "", ""
+        with open("/proc/mounts", "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) < 3:
+                    continue
+                mount = parts[1].replace("\\040", " ")
+                # Compare whole components so /home/me2 doesn't match a /home/me mount
+                if os.path.commonpath([root, mount]) == mount and len(mount) > len(best):
+                    best, fstype = mount, parts[2]
+        if fstype.startswith(("nfs", "cifs", "smb", "sshfs", "fuse.sshfs", "9p")):
+            return "network"
+    except Exception:
+        pass
+    try:
+        st = os.stat(root)
+        block = f"/sys/dev/block/{os.major(st.st_dev)}:{os.minor(st.st_dev)}"
+        for rel in ("queue/rotational", "../queue/rotational"):
+            p = os.path.join(block, rel)
+            if os.path.exists(p):
+                with open(p, "r") as f:
+                    return "hdd" if f.read().strip() == "1" else "ssd"
+    except Exception:
+        pass
+    return "fixed"
+
+def classify_device(root):
+    """Return one of the DEVICE_CONCURRENCY keys for the volume holding root."""
+    try:
+        if os.name == "nt":
+            return _windows_device_class(root)
+        return _posix_device_class(root)
+    except Exception:
+        return "fixed"
+
+def plan_index_shards(roots):
+    """Group roots by the device they live on: [(device_key, device_class, [roots])]."""
+    by_device = {}
+    for root in roots:
+        try:
+            dev = os.stat(root).st_dev
+        except OSError:
+            continue
+        by_device.setdefault(dev, []).append(root)
+    return [(dev, classify_device(rs[0]), rs) for dev, rs in by_device.items()]
+
+def _scan_dir(path, pace=None, skip=(INDEX_SKIP_DIRS, ())):
+    """List one directory: returns (rows, subdirs) without following links.
+    Rows are (path, name, is_directory, size, mtime, ext); skip is (dir
+    names, full paths), both lower-cased."""
+    skip_names, skip_paths = skip
+    if pace:
+        pace()
+    rows, subdirs = [], []
+    try:
+        with os.scandir(path) as it:
+            for e in it:
+                try:
+                    is_dir = e.is_dir(follow_symlinks=False)
+                    if is_dir and (e.is_symlink() or e.name.lower() in skip_names
+                                   or (skip_paths and os.path.normpath(e.path).lower() in skip_paths)):
+                        continue
+                    # On Windows the DirEntry already holds the find data, so
+                    # this stat is free; elsewhere it is one lstat per entry
+                    try:
+                        st = e.stat(follow_symlinks=False)
+                        size, mtime = (None if is_dir else st.st_size), st.st_mtime
+                    except OSError:
+                        size = mtime = None
+                    rows.append((e.path, e.name, 1 if is_dir else 0, size, mtime,
+                                 None if is_dir else _file_ext(e.name)))
+                    if is_dir:
+                        subdirs.append(e.path)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return rows, subdirs
+
+INDEX_LOCK_RETRIES = 5
+
+def _remove_db_file(path):
+    for suffix in ("", "-journal", "-wal", "-shm"):
+        try:
+            os.remove(path + suffix)
+        except OSError:
+            pass
+
+def _retry_locked(fn, what):
+    """Run fn(), retrying when another writer holds the index lock past the
+    connection timeout; other errors propagate."""
+    for attempt in range(INDEX_LOCK_RETRIES):
+        try:
+            return fn()
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) or attempt == INDEX_LOCK_RETRIES - 1:
+                raise
+            print(f"[indexer] {what}: index busy, retrying ({attempt + 1}/{INDEX_LOCK_RETRIES - 1})")
+            time.sleep(2 ** attempt)
+
+def _index_shard(shard_id, device_class, roots, db_path, pace=None, on_done=None):
+    """Walk one device with its own worker pool, staging rows in a database
+    file of its own so shards never contend for the index's write lock until
+    their single merge."""
+    workers = DEVICE_CONCURRENCY.get(device_class, 1)
+    skip = index_exclusions()
+    stage_path = f"{db_path}.stage{shard_id}"
+    started = time.time()
+    _remove_db_file(stage_path)
+    stage = sqlite3.connect(stage_path)
+    conn = None
+    try:
+        stage.execute("PRAGMA journal_mode=OFF")
+        stage.execute("PRAGMA synchronous=OFF")
+        stage.execute("CREATE TABLE files_stage (path TEXT, name TEXT, is_directory INTEGER, "
+                      "size INTEGER, mtime REAL, ext TEXT)")
+        stage.commit()
+
+        batch = []
+        total = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = {pool.submit(_scan_dir, r, pace, skip) for r in roots}
+            while pending:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for fut in done:
+                    rows, subdirs = fut.result()
+                    batch.extend(rows)
+                    for d in subdirs:
+                        pending.add(pool.submit(_scan_dir, d, pace, skip))
+                if len(batch) >= INDEX_BATCH_SIZE:
+                    with stage:
+                        stage.executemany("INSERT INTO files_stage VALUES (?, ?, ?, ?, ?, ?)", batch)
+                    total += len(batch)
+                    batch = []
+        if batch:
+            with stage:
+                stage.executemany("INSERT INTO files_stage VALUES (?, ?, ?, ?, ?, ?)", batch)
+            total += len(batch)
+        stage.close()
+        stage = None
+
+        # Merge as soon as this device is done so fast drives are searchable
+        # without waiting on slow ones.
+        conn = sqlite3.connect(db_path, timeout=30)
+        conn.execute("ATTACH DATABASE ? AS shard", (stage_path,))
+
+        def merge():
+            with conn:
+                for root in roots:
+                    conn.execute("DELETE FROM files WHERE path = ? OR (path >= ? AND path < ?)",
+                                 (root, *_subtree_range(root)))
+                conn.execute("INSERT OR REPLACE INTO files (path, name, is_directory, size, mtime, indexed_at, ext) "
+                             "SELECT path, name, is_directory, size, mtime, ?, ext FROM shard.files_stage",
+                             (time.time(),))
+        with _index_merge_lock:
+            _retry_locked(merge, f"merging {device_class} shard")
+        bump_index_generation(f"merged {device_class} shard")
+        if on_done:
+            on_done(roots)
+        print(f"[indexer] {device_class} shard {roots} -> {total} entries "
+              f"({workers} workers, {time.time() - started:.1f}s)")
+        return total
+    except Exception as e:
+        print(f"[indexer] shard {roots} failed: {e}")
+        return 0
+    finally:
+        if stage is not None:
+            stage.close()
+        if conn is not None:
+            conn.close()
+        _remove_db_file(stage_path)
+
+def _checkpoint_done_roots(ctx, done_roots, shard_roots):
+    done_roots.extend(shard_roots)
+    ctx.save({"done_roots": done_roots})
+
+def index_files(roots=None, db_path=None, ctx=None):
+    """Build the local file index, one concurrent shard per device.
+
+    Each shard walks its roots with a pool sized by DEVICE_CONCURRENCY and
+    merges into the shared `files` table when it finishes. When run as a
+    scheduler job (ctx), walkers are paced and merged roots are checkpointed
+    so an interrupted run resumes with the remaining devices.
+    """
+    db_path = db_path or DB_PATH
+    if not _index_run_lock.acquire(blocking=False):
+        print("[indexer] already running")
+        return 0
+    try:
+        roots = roots or get_all_drives() or get_search_paths()
+        done_roots = list(((ctx and ctx.checkpoint) or {}).get("done_roots", []))
+        roots = [r for r in roots if r not in done_roots]
+        pace = ctx.pace if ctx is not None else None
+        on_done = ((lambda shard_roots: _checkpoint_done_roots(ctx, done_roots, shard_roots))
+                   if ctx is not None else None)
+
+        conn = sqlite3.connect(db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            _ensure_index_schema(conn)
+            conn.commit()
+        finally:
+            conn.close()
+
+        shards = plan_index_shards(roots)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(shards))) as pool:
+            futures = [pool.submit(_index_shard, i, cls, rs, db_path, pace, on_done)
+                       for i, (_, cls, rs) in enumerate(shards)]
+            total = sum(f.result() for f in futures)
+        print(f"[indexer] indexed {total} entries across {len(shards)} devices")
+        build_folder_index(db_path, pace)
+        return total
+    finally:
+        _index_run_lock.release()
+
 # ========== HELPER FUNCTIONS ==========
 
 def get_all_drives():
     """Get all available drives on the system"""
-    if HAS_PYWIN32:
+    if has_pywin32():
         try:
             drives = win32api.GetLogicalDriveStrings()
             drive_list = [d.strip() for d in drives.split('\000') if d.strip()]
@@ -524,7 +1624,7 @@ def create_default_icon():
     if _default_icon is not None:
         return _default_icon
     try:
-        if Image is None or ImageTk is None or ImageDraw is None:
+        if not (Image and ImageTk and ImageDraw):
             _default_icon = None
             return None
         img = Image.new("RGBA", (ICON_SIZE, ICON_SIZE), (60, 60, 60, 255))
@@ -535,29 +1635,151 @@ def create_default_icon():
     except:
         return None
 
-def extract_icon(path, size=ICON_SIZE):
-    if not os.path.exists(path) or not HAS_PYWIN32:
-        return create_default_icon()
-    if path in icon_cache:
-        return icon_cache[path]
+# ========== PERSISTENT ICON CACHE ==========
+
+# Pre-rendered RGBA pixels keyed by (path, size) and validated by mtime, so
+# later launches never call ExtractIconEx for an unchanged file. An entry
+# with no pixels records "no icon here" and maps to the default icon.
+ICON_CACHE_PATH = data_path("icon_cache.db")
+_icon_db_local = threading.local()
+
+def icon_key(path, index=0):
+    """Cache key for the icon at index in path ("file|index"; '|' can't occur
+    in a Windows path). Index 0 means the first icon the file has."""
+    return f"{path}|{index}" if index else path
+
+def split_icon_key(key):
+    path, sep, index = key.rpartition("|")
+    if sep and index.lstrip("-").isdigit():
+        return path, int(index)
+    return key, 0
+
+class IconCache:
+    """LRU of PhotoImages bounded by a pixel-byte budget.
 
+    Paths map to a content digest and each distinct image is held once, so
+    the many shortcuts sharing the generic exe icon cost a single PhotoImage.
+    Paths with no icon map to None (the default icon) and cost nothing.
+    """
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._paths = OrderedDict()  # path -> digest, least recently used first
+        self._images = {}            # digest -> [photo, nbytes, refcount]
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    def __contains__(self, path):
+        return path in self._paths
+
+    def get(self, path):
+        """Cached image for path (None means the default icon); KeyError on a miss."""
+        with self._lock:
+            digest = self._paths[path]
+            self._paths.move_to_end(path)
+            return self._images[digest][0] if digest is not None else create_default_icon()
+
+    def image_for(self, digest):
+        with self._lock:
+            entry = self._images.get(digest)
+            return entry[0] if entry else None
+
+    def put(self, path, digest, photo=None, nbytes=0):
+        with self._lock:
+            self._release(path)
+            if digest is not None:
+                entry = self._images.get(digest)
+                if entry is None:
+                    entry = self._images[digest] = [photo, nbytes, 0]
+                    self._bytes += nbytes
+                entry[2] += 1
+            self._paths[path] = digest
+            while self._bytes > self.budget_bytes and len(self._paths) > 1:
+                self._release(next(iter(self._paths)))
+
+    def _release(self, path):
+        digest = self._paths.pop(path, None)
+        if digest is None:
+            return
+        entry = self._images[digest]
+        entry[2] -= 1
+        if entry[2] <= 0:
+            del self._images[digest]
+            self._bytes -= entry[1]
+
+    def stats(self):
+        with self._lock:
+            return {"paths": len(self._paths), "images": len(self._images),
+                    "bytes": self._bytes, "budget": self.budget_bytes}
+
+icon_cache = IconCache(ICON_CACHE_BUDGET_BYTES)
+
+def icon_cache_report():
+    s = icon_cache.stats()
+    return (f"{s['paths']} paths, {s['images']} unique icons, "
+            f"{s['bytes'] // 1024} KB of {s['budget'] // 1024} KB")
+
+def _icon_db():
+    """Per-thread connection to the icon store (created on first use)."""
+    conn = getattr(_icon_db_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(ICON_CACHE_PATH, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS icons (path TEXT, size INTEGER, mtime REAL, "
+                     "width INTEGER, height INTEGER, pixels BLOB, PRIMARY KEY (path, size))")
+        conn.commit()
+        _icon_db_local.conn = conn
+    return conn
+
+def icon_store_get(path, mtime, size):
+    """(width, height, rgba) for a fresh entry, or None on a miss or stale mtime."""
     try:
-        hicon = None
-        for i in range(5):
-            large, small = win32gui.ExtractIconEx(path, i)
-            if small:
-                hicon = small[0]
-                if large:
-                    win32gui.DestroyIcon(large[0])
-                break
-            elif large:
-                hicon = large[0]
-                break
+        row = _icon_db().execute("SELECT mtime, width, height, pixels FROM icons WHERE path=? AND size=?",
+                                 (path, size)).fetchone()
+    except sqlite3.Error:
+        return None
+    if row is None or row[0] != mtime:
+        return None
+    return row[1], row[2], row[3]
+
+def icon_store_has(path, size=ICON_SIZE):
+    """True if the store holds an up-to-date entry for path (no pixel read)."""
+    try:
+        mtime = os.stat(split_icon_key(path)[0]).st_mtime
+        row = _icon_db().execute("SELECT mtime FROM icons WHERE path=? AND size=?", (path, size)).fetchone()
+    except (OSError, ValueError, sqlite3.Error):
+        return False
+    return row is not None and row[0] == mtime
 
-        if not hicon:
-            icon_cache[path] = create_default_icon()
-            return icon_cache[path]
+def icon_store_put(path, mtime, size, width, height, pixels):
+    try:
+        conn = _icon_db()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO icons VALUES (?, ?, ?, ?, ?, ?)",
+                         (path, size, mtime, width, height, pixels))
+    except sqlite3.Error as e:
+        print(f"[icon] could not store {path}: {e}")
+
+def _extract_icon_pixels(path, size):
+    """Render the shell icon of an icon key to (width, height, RGBA bytes); (0, 0, b"") if none."""
+    path, index = split_icon_key(path)
+    hicon = None
+    for i in ((index,) if index else range(5)):
+        large, small = win32gui.ExtractIconEx(path, i)
+        if small:
+            hicon = small[0]
+            if large:
+                win32gui.DestroyIcon(large[0])
+            break
+        elif large:
+            hicon = large[0]
+            break
+
+    if not hicon:
+        return 0, 0, b""
 
+    try:
         hdc = win32ui.CreateDCFromHandle(win32gui.GetDC(0))
         hbmp = win32ui.CreateBitmap()
         hbmp.CreateCompatibleBitmap(hdc, size, size)
@@ -567,98 +1789,935 @@ def extract_icon(path, size=ICON_SIZE):
 
         bmpinfo = hbmp.GetInfo()
         bmpstr = hbmp.GetBitmapBits(True)
-        if Image is None:
-            win32gui.DestroyIcon(hicon)
-            icon_cache[path] = None
-            return None
         img = Image.frombuffer("RGB", (bmpinfo["bmWidth"], bmpinfo["bmHeight"]),
                                bmpstr, "raw", "BGRX", 0, 1)
-        img = img.resize((size, size), Image.LANCZOS)
-
+        img = img.resize((size, size), Image.LANCZOS).convert("RGBA")
+        return size, size, img.tobytes()
+    finally:
         win32gui.DestroyIcon(hicon)
 
-        tk_img = ImageTk.PhotoImage(img)
-        icon_cache[path] = tk_img
+def _photo_from_pixels(width, height, pixels):
+    if not pixels:
+        return create_default_icon()
+    return ImageTk.PhotoImage(Image.frombytes("RGBA", (width, height), pixels))
+
+def load_icon_pixels(path, size=ICON_SIZE):
+    """Worker-safe half of icon loading (no Tk calls): (width, height, rgba)
+    from the persistent store, extracting and storing on a miss. Returns
+    (0, 0, b"") when there is no icon to show."""
+    if not has_pywin32() or not Image:
+        return 0, 0, b""
+    try:
+        mtime = os.stat(split_icon_key(path)[0]).st_mtime
+    except (OSError, ValueError):
+        return 0, 0, b""
+    try:
+        cached = icon_store_get(path, mtime, size)
+        if cached is None:
+            cached = _extract_icon_pixels(path, size)
+            icon_store_put(path, mtime, size, *cached)
+        return cached
+    except Exception as e:
+        print(f"[icon] failed for {path}: {e}")
+        return 0, 0, b""
+
+def _install_icon(path, cached):
+    """Tk-thread half: turn pixels into a deduplicated PhotoImage in icon_cache."""
+    width, height, pixels = cached
+    if not pixels or not ImageTk:
+        icon_cache.put(path, None)
+        return create_default_icon()
+    try:
+        digest = hashlib.blake2b(pixels, digest_size=16, key=b"%dx%d" % (width, height)).digest()
+        tk_img = icon_cache.image_for(digest) or _photo_from_pixels(width, height, pixels)
+        icon_cache.put(path, digest, tk_img, len(pixels))
         return tk_img
     except Exception as e:
         print(f"[icon] failed for {path}: {e}")
-        fallback = create_default_icon()
-        icon_cache[path] = fallback
-        return fallback
-
-def index_apps(extract_icons=False):
-    global apps
-    apps = []
-    if HAS_PYWIN32:
+        icon_cache.put(path, None)
+        return create_default_icon()
+
+# ========== ASYNC ICON PIPELINE ==========
+
+# Workers decode pixels off the Tk thread and post them to _icon_ready; the
+# Tk thread drains that queue once per frame, creating the PhotoImages in a
+# batch and patching any rows waiting on them.
+ICON_WORKERS = 4
+ICON_FRAME_MS = 16
+_icon_pool = concurrent.futures.ThreadPoolExecutor(max_workers=ICON_WORKERS, thread_name_prefix="yoi-icon")
+_icon_ready = queue.Queue()
+_icon_waiters = {}  # path -> [callback(photo)], Tk thread only
+_icon_drain_scheduled = False
+
+def post_icon_pixels(path, cached):
+    """Hand decoded pixels to the Tk thread; callable from any thread."""
+    global _icon_drain_scheduled
+    _icon_ready.put((path, cached))
+    if not _icon_drain_scheduled and search_window is not None:
+        _icon_drain_scheduled = True
+        search_window.after(ICON_FRAME_MS, _drain_icon_queue)
+
+def _drain_icon_queue():
+    global _icon_drain_scheduled
+    _icon_drain_scheduled = False
+    while True:
         try:
-            shell = win32com.client.Dispatch("WScript.Shell")
-        except Exception:
-            shell = None
+            path, cached = _icon_ready.get_nowait()
+        except queue.Empty:
+            break
+        tk_img = _install_icon(path, cached)
+        for callback in _icon_waiters.pop(path, ()):
+            try:
+                callback(tk_img)
+            except Exception as e:
+                print(f"[icon] patch failed for {path}: {e}")
 
-    for base in INDEX_PATHS:
-        if os.path.exists(base):
-            for root, _, files in os.walk(base):
-                for f in files:
-                    if f.lower().endswith(".lnk"):
-                        full_path = os.path.join(root, f)
-                        target = None
-                        if HAS_PYWIN32 and 'shell' in locals() and shell is not None:
-                            try:
-                                shortcut = shell.CreateShortcut(full_path)
-                                target = shortcut.Targetpath
-                            except Exception:
-                                target = None
-                        icon_img = None
-                        if extract_icons and target:
-                            icon_img = extract_icon(target) or extract_icon(full_path)
-                        apps.append({
-                            "name": os.path.splitext(f)[0],
-                            "path": full_path,
-                            "target": target,
-                            "type": "app",
-                            "icon": icon_img
-                        })
+def _load_icon_async(path):
+    post_icon_pixels(path, load_icon_pixels(path))
 
-    system32 = os.path.expandvars(r"%windir%\system32")
-    for app in SYSTEM_APPS:
-        exe_path = os.path.join(system32, app["exe"])
-        if os.path.exists(exe_path):
-            icon_img = extract_icon(exe_path) if extract_icons and HAS_PYWIN32 else None
-            apps.append({
-                "name": app["name"],
-                "path": exe_path,
-                "target": exe_path,
-                "type": "system",
-                "icon": icon_img
-            })
+def request_icon(path, callback):
+    """Tk thread: return the cached icon now, or None and call callback(photo)
+    from a later frame once a worker has decoded it."""
+    try:
+        return icon_cache.get(path)
+    except KeyError:
+        pass
+    waiters = _icon_waiters.get(path)
+    if waiters is None:
+        _icon_waiters[path] = [callback]
+        _icon_pool.submit(_load_icon_async, path)
+    else:
+        waiters.append(callback)
+    return None
+
+# ========== SHELL LINK (.lnk) PARSER ==========
+
+# Binary reader for MS-SHLLINK files so shortcut targets resolve without a
+# WScript.Shell COM round trip per file (and off Windows, e.g. for fixtures).
+LNK_HEADER_SIZE = 0x4C
+LNK_CLSID = bytes.fromhex("0114020000000000c000000000000046")
+LNK_HAS_ID_LIST = 0x01
+LNK_HAS_LINK_INFO = 0x02
+LNK_IS_UNICODE = 0x80
+LNK_FORCE_NO_LINK_INFO = 0x100
+LNK_STRING_FIELDS = ((0x04, "name"), (0x08, "relative_path"), (0x10, "working_dir"),
+                     (0x20, "arguments"), (0x40, "icon_location"))
+LNK_ENV_BLOCK = 0xA0000001
+LNK_ICON_ENV_BLOCK = 0xA0000007
+_LNK_ANSI = "mbcs" if os.name == "nt" else "cp1252"
+
+def _lnk_cstr(data, off, unicode):
+    """NUL-terminated string at off (UTF-16LE or ANSI)."""
+    if off <= 0 or off >= len(data):
+        return ""
+    if unicode:
+        end = data.find(b"\0\0", off)
+        while end != -1 and (end - off) % 2:
+            end = data.find(b"\0\0", end + 1)
+        return data[off:len(data) if end == -1 else end].decode("utf-16-le", "replace")
+    end = data.find(b"\0", off)
+    return data[off:len(data) if end == -1 else end].decode(_LNK_ANSI, "replace")
+
+def _lnk_link_info_target(info):
+    """Target path from a LinkInfo structure (local volume or network share)."""
+    if len(info) < 28:
+        return None
+    _, header_size, flags, _, base_off, net_off, suffix_off = struct.unpack_from("<7I", info, 0)
+    base_u = suffix_u = 0
+    if header_size >= 0x24 and len(info) >= 36:
+        base_u, suffix_u = struct.unpack_from("<II", info, 28)
+    suffix = _lnk_cstr(info, suffix_u, True) if suffix_u else _lnk_cstr(info, suffix_off, False)
+    if flags & 0x1:
+        base = _lnk_cstr(info, base_u, True) if base_u else _lnk_cstr(info, base_off, False)
+        if not base:
+            return None
+        if suffix and not base.endswith("\\"):
+            base += "\\"
+        return base + suffix
+    if flags & 0x2 and net_off and net_off + 20 <= len(info):
+        net = info[net_off:]
+        _, _, name_off, _, _ = struct.unpack_from("<5I", net, 0)
+        if name_off > 0x14 and len(net) >= 24:
+            name = _lnk_cstr(net, struct.unpack_from("<I", net, 20)[0], True)
+        else:
+            name = _lnk_cstr(net, name_off, False)
+        if not name:
+            return None
+        return name + "\\" + suffix if suffix else name
+    return None
 
-    print(f"[spotlight] indexed {len(apps)} apps")
+def _lnk_file_entry_name(item):
+    """Long name of a file-entry shell item, falling back to its 8.3 name."""
+    unicode = bool(item[0] & 0x04)
+    short = _lnk_cstr(item, 12, unicode)
+    ext = item.find(b"\x04\x00\xef\xbe")
+    if ext < 4:
+        return short
+    start = ext - 4
+    version = struct.unpack_from("<H", item, start + 2)[0]
+    off = start + 18
+    if version >= 7:
+        off += 18
+    if version >= 3:
+        off += 2
+    if version >= 9:
+        off += 4
+    if version >= 8:
+        off += 4
+    return _lnk_cstr(item, off, True) or short
+
+def _lnk_id_list_target(id_list):
+    """Best-effort filesystem path from a LinkTargetIDList (drive + file entries)."""
+    parts = []
+    off = 0
+    while off + 2 <= len(id_list):
+        size = struct.unpack_from("<H", id_list, off)[0]
+        if size < 2:
+            break
+        item = id_list[off + 2:off + size]
+        off += size
+        if not item:
+            continue
+        kind = item[0] & 0x70
+        if kind == 0x20:
+            parts = [_lnk_cstr(item, 1, False)]
+        elif kind == 0x30 and parts:
+            parts.append(_lnk_file_entry_name(item))
+    if not parts or not parts[0].endswith(":\\"):
+        return None
+    return parts[0] + "\\".join(parts[1:])
 
-def preload_icons_background():
-    """Preload all icons in background after Tk is ready."""
-    time.sleep(0.5)
-    print("[spotlight] preloading icons in background...")
-    for app in apps:
-        if app["icon"] is None:
-            app["icon"] = extract_icon(app["path"]) or extract_icon(app.get("target", ""))
-    print("[spotlight] icon preloading complete")
+def parse_lnk(data):
+    """Parse Shell Link bytes into a dict of target, arguments, working_dir,
+    icon_location, icon_index, name and relative_path. Returns None if the
+    data is not a shell link.
+    """
+    if len(data) < LNK_HEADER_SIZE or data[4:20] != LNK_CLSID \
+            or struct.unpack_from("<I", data, 0)[0] != LNK_HEADER_SIZE:
+        return None
+    flags = struct.unpack_from("<I", data, 20)[0]
+    icon_index = struct.unpack_from("<i", data, 56)[0]
+    off = LNK_HEADER_SIZE
+    try:
+        id_list = b""
+        if flags & LNK_HAS_ID_LIST:
+            size = struct.unpack_from("<H", data, off)[0]
+            id_list = data[off + 2:off + 2 + size]
+            off += 2 + size
+
+        target = None
+        if flags & LNK_HAS_LINK_INFO:
+            size = struct.unpack_from("<I", data, off)[0]
+            if not flags & LNK_FORCE_NO_LINK_INFO:
+                target = _lnk_link_info_target(data[off:off + size])
+            off += size
+
+        unicode = flags & LNK_IS_UNICODE
+        strings = {}
+        for bit, key in LNK_STRING_FIELDS:
+            if flags & bit:
+                count = struct.unpack_from("<H", data, off)[0]
+                n = count * 2 if unicode else count
+                raw = data[off + 2:off + 2 + n]
+                strings[key] = raw.decode("utf-16-le" if unicode else _LNK_ANSI, "replace")
+                off += 2 + n
+
+        env_target = env_icon = None
+        while off + 8 <= len(data):
+            size, sig = struct.unpack_from("<II", data, off)
+            if size < 8:
+                break
+            if sig in (LNK_ENV_BLOCK, LNK_ICON_ENV_BLOCK) and size >= 0x314:
+                value = _lnk_cstr(data, off + 8 + 260, True) or _lnk_cstr(data, off + 8, False)
+                if sig == LNK_ENV_BLOCK:
+                    env_target = value
+                else:
+                    env_icon = value
+            off += size
+    except struct.error:
+        return None
 
-def is_url(text: str) -> bool:
-    return bool(re.match(r"^(https?://)?([\w\-]+\.)+[\w\-]+", text.strip()))
+    if not target and env_target:
+        target = os.path.expandvars(env_target)
+    if not target and id_list:
+        target = _lnk_id_list_target(id_list)
+    icon_location = strings.get("icon_location") or env_icon or ""
+    return {
+        "target": target,
+        "arguments": strings.get("arguments", ""),
+        "working_dir": strings.get("working_dir", ""),
+        "icon_location": os.path.expandvars(icon_location),
+        "icon_index": icon_index,
+        "name": strings.get("name", ""),
+        "relative_path": strings.get("relative_path", ""),
+    }
 
-def open_url(url: str):
-    if not url.startswith(("http://", "https://")):
-        url = "https://" + url
-    webbrowser.open(url)
+def read_lnk(path):
+    """Parse the .lnk file at path; relative targets resolve against its folder."""
+    try:
+        with open(path, "rb") as f:
+            info = parse_lnk(f.read())
+    except OSError:
+        return None
+    if info and not info["target"] and info["relative_path"]:
+        info["target"] = ntpath.normpath(ntpath.join(ntpath.dirname(path), info["relative_path"]))
+    return info
 
-def calculate(expr: str):
-    expr = expr.strip()
-    if re.fullmatch(r"[0-9+\-*/().\s]+", expr):
+def read_lnks(paths, max_workers=8):
+    """Parse many shortcuts concurrently: {path: info or None}."""
+    paths = list(paths)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(paths, pool.map(read_lnk, paths)))
+
+_com_state = threading.local()
+
+def _get_shell():
+    """Per-thread WScript.Shell (COM objects are apartment-bound), or None."""
+    if not has_pywin32():
+        return None
+    shell = getattr(_com_state, "shell", None)
+    if shell is None:
+        try:
+            import pythoncom
+            pythoncom.CoInitialize()
+        except Exception:
+            pass
         try:
-            return str(eval(expr, {"__builtins__": {}}, {}))
+            shell = win32com.client.Dispatch("WScript.Shell")
         except Exception:
             return None
-    return None
+        _com_state.shell = shell
+    return shell
+
+APP_RESOLVE_WORKERS = 8
+
+def lnk_icon_source(info):
+    """Icon key for a parsed shortcut: its explicit icon location, else the
+    target (ExtractIconEx can't read icons out of the .lnk itself)."""
+    if info["icon_location"]:
+        return icon_key(info["icon_location"], info["icon_index"])
+    return info["target"]
+
+def _resolve_shortcut_com(full_path):
+    """(target, arguments, icon key) via WScript.Shell, for links the parser
+    cannot resolve (e.g. MSI advertised shortcuts)."""
+    shell = _get_shell()
+    if shell is None:
+        return None, "", None
+    try:
+        shortcut = shell.CreateShortcut(full_path)
+        location, _, index = shortcut.IconLocation.rpartition(",")
+        icon = None
+        if location:
+            icon = icon_key(os.path.expandvars(location), int(index) if index.lstrip("-").isdigit() else 0)
+        return shortcut.Targetpath, shortcut.Arguments, icon
+    except Exception:
+        return None, "", None
+
+def _resolve_entries(entries):
+    """Fill in target/args/icon for shortcut entries: every .lnk is parsed on
+    a thread pool, and only the ones the parser can't resolve go to COM."""
+    if not entries:
+        return
+    infos = read_lnks([a["path"] for a in entries], APP_RESOLVE_WORKERS)
+    unresolved = []
+    for a in entries:
+        info = infos[a["path"]]
+        if info and info["target"]:
+            a["target"], a["args"], a["icon"] = info["target"], info["arguments"], lnk_icon_source(info)
+        else:
+            unresolved.append(a)
+    if not unresolved:
+        return
+    with concurrent.futures.ThreadPoolExecutor(max_workers=APP_RESOLVE_WORKERS) as pool:
+        for a, (target, args, icon) in zip(unresolved, pool.map(_resolve_shortcut_com,
+                                                                [a["path"] for a in unresolved])):
+            a["target"] = target
+            a["args"] = args or ""
+            a["icon"] = icon
+
+def _dedupe_apps(entries):
+    """Keep the first entry per resolved (target, arguments); the user Start
+    Menu is walked first, so its shortcuts win over common duplicates."""
+    seen = set()
+    unique = []
+    for a in entries:
+        if a["target"]:
+            key = (os.path.normcase(os.path.normpath(a["target"])), a.get("args", ""))
+            if key in seen:
+                continue
+            seen.add(key)
+        unique.append(a)
+    return unique
+
+def _dir_mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+def _scan_shortcut_dir(path):
+    """Scan one Start Menu directory (non-recursive): (entries, subdirs) or None.
+
+    Entries are unresolved; see _resolve_entries.
+    """
+    entries, subdirs = [], []
+    try:
+        with os.scandir(path) as it:
+            for e in it:
+                try:
+                    if e.is_dir():
+                        subdirs.append(e.path)
+                    elif e.name.lower().endswith(".lnk"):
+                        entries.append({
+                            "name": os.path.splitext(e.name)[0],
+                            "path": e.path,
+                            "target": None,
+                            "args": "",
+                            "icon": None,
+                            "type": "app"
+                        })
+                except OSError:
+                    continue
+    except OSError:
+        return None
+    return entries, subdirs
+
+def _walk_shortcut_tree(base, dirs, entries):
+    """Walk a Start Menu tree, recording each directory's mtime in dirs."""
+    stack = [base]
+    while stack:
+        d = stack.pop()
+        mtime = _dir_mtime(d)
+        scanned = _scan_shortcut_dir(d) if mtime is not None else None
+        if scanned is None:
+            continue
+        found, subdirs = scanned
+        dirs[d] = mtime
+        entries.extend(found)
+        stack.extend(reversed(subdirs))
+
+def _system_app_entries():
+    system32 = os.path.expandvars(r"%windir%\system32")
+    entries = []
+    for app in SYSTEM_APPS:
+        exe_path = os.path.join(system32, app["exe"])
+        if os.path.exists(exe_path):
+            entries.append({
+                "name": app["name"],
+                "path": exe_path,
+                "target": exe_path,
+                "args": "",
+                "icon": exe_path,
+                "type": "system"
+            })
+    return entries
+
+# ========== COLUMNAR APP CATALOG ==========
+
+# The searchable catalog is kept as parallel arrays instead of a dict per
+# entry. Names and args are interned, so repeated names such as "Uninstall"
+# are stored once; casefolded names are only materialized if the substring
+# fallback (no rapidfuzz) needs them. Paths and targets are split into an interned
+# directory prefix (stored once per directory, referenced by id) plus a
+# basename. Kinds, directory ids and icon ids are packed in typed arrays.
+# `names` is handed to the fuzzy matcher as-is instead of being rebuilt on
+# every query.
+CATALOG_KINDS = ("app", "system")
+
+def _split_path(path):
+    cut = max(path.rfind("\\"), path.rfind("/")) + 1
+    return path[:cut], path[cut:]
+
+class AppCatalog:
+    def __init__(self):
+        self.names = []
+        self._norm_names = None
+        self.path_dirs = array.array("I")
+        self.path_names = []
+        self.target_dirs = array.array("I")
+        self.target_names = []        # None when the shortcut did not resolve
+        self.args = []
+        self.kinds = array.array("B")
+        self.icon_ids = array.array("I")  # index into icons
+        self.icons = []               # distinct icon keys (see icon_key), shared across rows
+        self.dirs = []                # directory prefixes, including the separator
+        self._dir_index = {}
+        self._icon_index = {}
+
+    @classmethod
+    def from_entries(cls, entries):
+        catalog = cls()
+        for a in entries:
+            catalog.add(a["name"], a["path"], a["target"], a["args"], a["type"], a.get("icon"))
+        catalog._icon_index = None  # only needed while building
+        return catalog
+
+    def _dir_id(self, prefix):
+        dir_id = self._dir_index.get(prefix)
+        if dir_id is None:
+            dir_id = self._dir_index[prefix] = len(self.dirs)
+            self.dirs.append(sys.intern(prefix))
+        return dir_id
+
+    def add(self, name, path, target, args, kind, icon=None):
+        """icon is the row's icon key; without one the icon comes from the
+        target, or from path when the shortcut did not resolve."""
+        intern = sys.intern
+        name = intern(name)
+        self.names.append(name)
+        if self._norm_names is not None:
+            self._norm_names.append(intern(name.casefold()))
+        prefix, base = _split_path(path)
+        self.path_dirs.append(self._dir_id(prefix))
+        self.path_names.append(base)
+        prefix, base = _split_path(target or "")
+        self.target_dirs.append(self._dir_id(prefix))
+        self.target_names.append(base if target else None)
+        self.args.append(intern(args or ""))
+        self.kinds.append(CATALOG_KINDS.index(kind))
+        icon = icon or target or path
+        icon_id = self._icon_index.get(os.path.normcase(icon))
+        if icon_id is None:
+            icon_id = self._icon_index[os.path.normcase(icon)] = len(self.icons)
+            self.icons.append(icon)
+        self.icon_ids.append(icon_id)
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def norm_names(self):
+        """Casefolded names, for the substring fallback."""
+        if self._norm_names is None:
+            self._norm_names = [sys.intern(n.casefold()) for n in self.names]
+        return self._norm_names
+
+    def path(self, i):
+        return self.dirs[self.path_dirs[i]] + self.path_names[i]
+
+    def target(self, i):
+        base = self.target_names[i]
+        return None if base is None else self.dirs[self.target_dirs[i]] + base
+
+    def kind(self, i):
+        return CATALOG_KINDS[self.kinds[i]]
+
+    def icon_source(self, i):
+        return self.icons[self.icon_ids[i]]
+
+    def icon_sources(self):
+        """(icon key, first row using it) per distinct icon, in catalog order."""
+        first = {}
+        for i, icon_id in enumerate(self.icon_ids):
+            first.setdefault(icon_id, i)
+        return [(self.icons[icon_id], i) for icon_id, i in first.items()]
+
+    def entry(self, i):
+        """Row i as the dict shape used while indexing and in the snapshot."""
+        return {"name": self.names[i], "path": self.path(i), "target": self.target(i),
+                "args": self.args[i], "type": self.kind(i), "icon": self.icon_source(i)}
+
+    def rows(self):
+        return (self.entry(i) for i in range(len(self.names)))
+
+    def result(self, i, score=0.0):
+        return Result(self.kind(i), self.path(i), self.names[i], score=score,
+                      icon_source=self.icon_source(i))
+
+def _synthetic_app_entries(n):
+    words = ("Uninstall", "Readme", "Settings", "Help", "Studio", "Player", "Editor", "Tools")
+    for i in range(n):
+        vendor = f"Vendor{i % 997}"
+        name = words[i % len(words)] if i % 5 == 0 else f"{vendor} {words[i % len(words)]} {i}"
+        yield {"name": name,
+               "path": f"C:\\ProgramData\\Microsoft\\Windows\\Start Menu\\Programs\\{vendor}\\{name}.lnk",
+               "target": f"C:\\Program Files\\{vendor}\\app{i}.exe",
+               "args": "" if i % 7 else "--safe-mode",
+               "type": "app" if i % 50 else "system"}
+
+def catalog_memory_report(sizes=(100_000, 1_000_000)):
+    """Traced allocation of dict-per-entry vs AppCatalog for synthetic catalogs."""
+    import tracemalloc
+    import gc
+    lines = []
+    for n in sizes:
+        measured = {}
+        for label, build in (("dicts", lambda: [dict(a) for a in _synthetic_app_entries(n)]),
+                             ("columnar", lambda: AppCatalog.from_entries(_synthetic_app_entries(n)))):
+            gc.collect()
+            tracemalloc.start()
+            built = build()
+            measured[label] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del built
+        saved = 1 - measured["columnar"] / measured["dicts"]
+        lines.append(f"[catalog] {n:>9,} entries: dicts {measured['dicts'] / 2**20:7.1f} MB, "
+                     f"columnar {measured['columnar'] / 2**20:7.1f} MB ({saved:.0%} smaller)")
+    return "\n".join(lines)
+
+def _set_app_catalog(catalog):
+    """Install a full (un-deduplicated) catalog and publish the searchable apps."""
+    global apps, _app_catalog, _icon_catalog_seeded
+    _app_catalog = AppCatalog.from_entries(catalog)
+    apps = AppCatalog.from_entries(_dedupe_apps(catalog))
+    _icon_catalog_seeded = False  # the icon job re-queues the new catalog
+
+def index_apps():
+    """Single pass: walk the Start Menu trees, resolve shortcuts in parallel,
+    dedupe by target. Icons are left to the background icon job."""
+    started = time.perf_counter()
+    dirs, found = {}, []
+    for base in INDEX_PATHS:
+        if os.path.exists(base):
+            _walk_shortcut_tree(base, dirs, found)
+    _resolve_entries(found)
+    _set_app_catalog(found + _system_app_entries())
+    save_app_snapshot(dirs)
+    print(f"[spotlight] indexed {len(apps)} apps ({len(_app_catalog) - len(apps)} duplicates) "
+          f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+# ========== APP CATALOG SNAPSHOT ==========
+
+APPS_SNAPSHOT_PATH = data_path("apps_snapshot.json")
+APPS_SNAPSHOT_VERSION = 3
+_app_snapshot_dirs = {}
+_app_catalog = None
+
+def _system_dir_mtime():
+    return _dir_mtime(os.path.expandvars(r"%windir%\system32"))
+
+def save_app_snapshot(dirs):
+    """Persist the resolved catalog plus the mtime of every directory walked."""
+    global _app_snapshot_dirs
+    _app_snapshot_dirs = dict(dirs)
+    data = {
+        "version": APPS_SNAPSHOT_VERSION,
+        "dirs": dirs,
+        "system_mtime": _system_dir_mtime(),
+        "apps": [[a["name"], a["path"], a["target"], a["args"], a["type"], a["icon"]]
+                 for a in _app_catalog.rows()],
+    }
+    try:
+        tmp = APPS_SNAPSHOT_PATH + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, APPS_SNAPSHOT_PATH)
+    except Exception as e:
+        print(f"[snapshot] could not save app snapshot: {e}")
+
+def load_app_snapshot():
+    """Load the catalog from the snapshot; returns False if there is none usable."""
+    global _app_snapshot_dirs
+    started = time.perf_counter()
+    try:
+        with open(APPS_SNAPSHOT_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != APPS_SNAPSHOT_VERSION:
+            return False
+        _set_app_catalog([{"name": n, "path": p, "target": t, "args": args, "type": k, "icon": icon}
+                          for n, p, t, args, k, icon in data["apps"]])
+        _app_snapshot_dirs = data["dirs"]
+        _app_snapshot_dirs["__system__"] = data.get("system_mtime")
+    except Exception:
+        return False
+    print(f"[snapshot] loaded {len(apps)} apps in {(time.perf_counter() - started) * 1000:.1f}ms")
+    return True
+
+def revalidate_app_snapshot(ctx):
+    """Scheduler job: re-scan only the Start Menu directories whose mtime changed."""
+    dirs = dict(_app_snapshot_dirs)
+    system_mtime = dirs.pop("__system__", None)
+    changed = [d for d, m in dirs.items() if _dir_mtime(d) != m]
+    new_bases = [b for b in INDEX_PATHS if b not in dirs and os.path.exists(b)]
+    system_changed = _system_dir_mtime() != system_mtime
+    if not changed and not new_bases and not system_changed:
+        print("[snapshot] app catalog up to date")
+        return
+
+    current = list(_app_catalog.rows())
+    by_dir = {}
+    for a in current:
+        if a["type"] == "app":
+            by_dir.setdefault(os.path.dirname(a["path"]), []).append(a)
+    system = [a for a in current if a["type"] == "system"]
+
+    fresh = []
+    for d in changed:
+        ctx.pace()
+        mtime = _dir_mtime(d)
+        scanned = _scan_shortcut_dir(d) if mtime is not None else None
+        if scanned is None:
+            dirs.pop(d, None)
+            by_dir.pop(d, None)
+            continue
+        found, subdirs = scanned
+        dirs[d] = mtime
+        by_dir[d] = found
+        fresh.extend(found)
+        for sub in subdirs:
+            if sub not in dirs:
+                new_bases.append(sub)
+    for base in new_bases:
+        ctx.pace()
+        found = []
+        sub_dirs = {}
+        _walk_shortcut_tree(base, sub_dirs, found)
+        dirs.update(sub_dirs)
+        fresh.extend(found)
+        for a in found:
+            by_dir.setdefault(os.path.dirname(a["path"]), []).append(a)
+    _resolve_entries(fresh)
+    if system_changed:
+        system = _system_app_entries()
+
+    rebuilt = [a for d in dirs for a in by_dir.get(d, [])] + system
+    _set_app_catalog(rebuilt)
+    save_app_snapshot(dirs)
+    scheduler.submit("icons", preload_icons_background, JOB_PRIORITY_HIGH, JOB_LANE_ICONS)
+    print(f"[snapshot] revalidated {len(changed)} changed dirs, {len(apps)} apps")
+
+# ========== PREFERENCES ==========
+
+# One in-memory copy of spotlight_prefs.json for the whole process. Reads
+# never touch disk; writes mark the store dirty and a single timer flushes
+# it PREFS_FLUSH_DELAY_S later with a temp-file-plus-rename, so a burst of
+# changes costs one write off the UI thread.
+PREFS_FLUSH_DELAY_S = 2.0
+PREFS_DEFAULTS = {
+    "pdf_default": None,
+    "frecency": {},    # path -> [launch count, last launch epoch]
+    "exclusions": [],  # directory names or full paths the file indexer skips
+    "tuning": {},      # overrides for the knobs in TUNABLE_SETTINGS
+}
+TUNABLE_SETTINGS = ("SEARCH_DEBOUNCE_MS", "BACKGROUND_DUTY_CYCLE", "USER_IDLE_RESUME_S",
+                    "FRECENCY_HALF_LIFE_DAYS", "CALC_DEADLINE_MS", "ICON_CACHE_BUDGET_BYTES")
+
+class PrefsStore:
+    def __init__(self, path, flush_delay=PREFS_FLUSH_DELAY_S):
+        self.path = path
+        self.flush_delay = flush_delay
+        self.lock = threading.RLock()
+        self._write_lock = threading.Lock()  # one writer of the temp file at a time
+        self._data = None
+        self._timer = None
+        self._dirty = False  # set by set/update; flush writes nothing otherwise
+
+    def _loaded(self):
+        if self._data is None:
+            with self.lock:
+                if self._data is None:
+                    try:
+                        with open(self.path, "r", encoding="utf-8") as f:
+                            data = json.load(f)
+                    except Exception:
+                        data = {}
+                    self._data = data if isinstance(data, dict) else {}
+        return self._data
+
+    def get(self, key, default=None):
+        """Value of key; missing values, and hand edits whose JSON type doesn't
+        match the default's (say "tuning": []), read as the default."""
+        value = self._loaded().get(key)
+        if value is not None and not self._valid(key, value):
+            print(f"[prefs] ignoring {key}: expected {type(PREFS_DEFAULTS[key]).__name__}, "
+                  f"got {type(value).__name__}")
+            value = None
+        if value is None:
+            # A copy, so callers that mutate the result can't change the defaults
+            return copy.deepcopy(PREFS_DEFAULTS.get(key)) if default is None else default
+        return value
+
+    @staticmethod
+    def _valid(key, value):
+        expected = PREFS_DEFAULTS.get(key)
+        return expected is None or isinstance(value, type(expected))
+
+    def set(self, key, value):
+        with self.lock:
+            self._loaded()[key] = value
+            self._dirty = True
+            self._schedule_flush()
+
+    def update(self, key, fn):
+        """Apply fn to the current value of key under the store lock and keep
+        the result; fn may mutate containers in place and return them."""
+        with self.lock:
+            data = self._loaded()
+            current = data.get(key)
+            if current is None or not self._valid(key, current):
+                current = copy.deepcopy(PREFS_DEFAULTS.get(key))
+            data[key] = fn(current)
+            self._dirty = True
+            self._schedule_flush()
+            return data[key]
+
+    def _schedule_flush(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        # The timer, atexit and tray exit can all flush at once: writers take
+        # turns on the temp file, and each snapshots the data only once it
+        # holds the write lock, so an older payload never lands last.
+        with self._write_lock:
+            with self.lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if self._data is None or not self._dirty:
+                    return
+                payload = json.dumps(self._data, separators=(",", ":"))
+                self._dirty = False
+            try:
+                tmp = self.path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                os.replace(tmp, self.path)
+            except Exception as e:
+                print(f"[prefs] could not save: {e}")
+                with self.lock:
+                    self._dirty = True
+
+prefs = PrefsStore(PREFS_PATH)
+atexit.register(prefs.flush)
+
+def apply_tuning():
+    """Override module-level knobs from prefs["tuning"] (same type as the default)."""
+    for name, value in prefs.get("tuning").items():
+        if name not in TUNABLE_SETTINGS:
+            print(f"[prefs] ignoring unknown tuning key {name}")
+            continue
+        try:
+            globals()[name] = type(globals()[name])(value)
+        except (TypeError, ValueError):
+            print(f"[prefs] bad value for {name}: {value!r}")
+    icon_cache.budget_bytes = ICON_CACHE_BUDGET_BYTES
+
+def index_exclusions():
+    """Lower-cased directory names and full paths the file indexer skips."""
+    names, paths = set(INDEX_SKIP_DIRS), set()
+    for item in prefs.get("exclusions"):
+        item = str(item).strip().lower()
+        if os.sep in item or "/" in item:
+            paths.add(os.path.normpath(item))
+        elif item:
+            names.add(item)
+    return names, paths
+
+# ========== USAGE (FRECENCY) ==========
+
+FRECENCY_HALF_LIFE_DAYS = 14
+
+def record_launch(path):
+    """Count a launch of path; entries are [count, last_launch_epoch]."""
+    def bump(data):
+        entry = data.get(path)
+        count = entry[0] if isinstance(entry, list) and entry and isinstance(entry[0], int) else 0
+        data[path] = [count + 1, time.time()]
+        return data
+    prefs.update("frecency", bump)
+
+def frecency_score(path, now=None):
+    """Launch count decayed by FRECENCY_HALF_LIFE_DAYS since the last launch."""
+    entry = prefs.get("frecency").get(path)
+    if not entry:
+        return 0.0
+    try:
+        age_days = max(0.0, (now or time.time()) - entry[1]) / 86400
+        return entry[0] * 0.5 ** (age_days / FRECENCY_HALF_LIFE_DAYS)
+    except (TypeError, IndexError, KeyError):
+        return 0.0  # hand-edited entry
+
+# ========== ICON PRELOADER ==========
+
+# Heap of (tier, -score, seq, path): tier 0 holds recent query hits (newest
+# first), tier 1 the catalog ordered by frecency. The job runs in its own
+# scheduler lane, warms icons in that order and skips anything the persistent
+# store already holds, so an interrupted run resumes where it left off.
+# A path is queued once; only moving up a tier pushes it again, and the
+# superseded heap entry is skipped when popped. Hints are throttled but don't
+# wait for the UI to go idle, since they are wanted while the user types; the
+# catalog tier waits, and a hint queued meanwhile jumps ahead of it.
+_icon_preload_heap = []
+_icon_preload_queued = {}  # path -> seq of its live heap entry, tier
+_icon_preload_seq = 0
+_icon_preload_lock = threading.Lock()
+_icon_catalog_seeded = False
+
+def queue_icon_preload(paths, tier, score=0.0):
+    global _icon_preload_seq
+    with _icon_preload_lock:
+        for p in paths:
+            queued = _icon_preload_queued.get(p)
+            if queued is not None and queued[1] <= tier:
+                continue
+            heapq.heappush(_icon_preload_heap, (tier, -score, _icon_preload_seq, p))
+            _icon_preload_queued[p] = (_icon_preload_seq, tier)
+            _icon_preload_seq += 1
+
+def hint_icon_preload(paths):
+    """Query hits: warm these icons ahead of the catalog order."""
+    paths = [p for p in paths if p and p not in icon_cache]
+    if not paths:
+        return
+    queue_icon_preload(paths, 0, time.time())
+    scheduler.submit("icons", preload_icons_background, JOB_PRIORITY_HIGH, JOB_LANE_ICONS)
+
+def _seed_icon_preload():
+    """Queue the current catalog's icons (tier 1) once per catalog swap."""
+    global _icon_catalog_seeded
+    _icon_catalog_seeded = True
+    now = time.time()
+    catalog = apps
+    for source, row in (catalog.icon_sources() if catalog is not None else ()):
+        queue_icon_preload([source], 1, frecency_score(catalog.path(row), now))
+
+def preload_icons_background(ctx):
+    """Scheduler job: warm hinted icons right away, the catalog when the UI is idle."""
+    print("[spotlight] preloading icons in background...")
+    loaded = skipped = 0
+    while True:
+        if not _icon_catalog_seeded:
+            _seed_icon_preload()
+        with _icon_preload_lock:
+            if not _icon_preload_heap:
+                break
+            hint = _icon_preload_heap[0][0] == 0
+        if hint:
+            lower_thread_priority()
+            time.sleep(ICON_HINT_INTERVAL_S)
+        elif ui_is_busy():
+            time.sleep(0.1)
+            continue
+        else:
+            ctx.pace()
+        with _icon_preload_lock:
+            if not _icon_preload_heap:
+                break
+            _, _, seq, path = heapq.heappop(_icon_preload_heap)
+            if _icon_preload_queued.get(path, (None,))[0] != seq:
+                continue  # re-queued at a higher tier
+            del _icon_preload_queued[path]
+        if path in icon_cache:
+            continue
+        if icon_store_has(path):
+            skipped += 1
+            continue
+        post_icon_pixels(path, load_icon_pixels(path))
+        loaded += 1
+    print(f"[spotlight] icon preloading complete: {loaded} loaded, {skipped} already stored "
+          f"({icon_cache_report()})")
+
+def is_url(text: str) -> bool:
+    return bool(re.match(r"^(https?://)?([\w\-]+\.)+[\w\-]+", text.strip()))
+
+def open_url(url: str):
+    if not url.startswith(("http://", "https://")):
+        url = "https://" + url
+    webbrowser.open(url)
 
 def safe_copy(text: str):
     try:
@@ -676,304 +2735,287 @@ def set_origin_for_entry():
     global _origin_x, _origin_y
     _origin_x, _origin_y = compute_center_position(WINDOW_WIDTH, ENTRY_HEIGHT)
 
-def create_file_result(full_path, file_type):
-    """Create a result dictionary for a file/folder"""
-    name = os.path.basename(full_path)
-    is_dir = os.path.isdir(full_path)
-    
-    if is_dir:
-        icon_char = "📁"
-        result_type = "folder"
-    else:
-        icon_char = "📄"
-        result_type = "file"
-    
-    def _open_with_brave(url):
-        candidates = [
-            r"C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe",
-            r"C:\\Program Files (x86)\\BraveSoftware\\Brave-Browser\\Application\\brave.exe",
-            "brave.exe"
-        ]
-        for exe in candidates:
-            try:
-                subprocess.Popen([exe, url], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                return True
-            except Exception:
-                continue
-        return False
+# ========== RESULTS ==========
+
+# Results are small slotted records; what happens on Enter is looked up in
+# RESULT_ACTIONS by kind and applied to the record's id only at launch, so
+# building a page of results allocates no closures and makes no syscalls.
+RESULT_GLYPHS = {"file": "📄", "folder": "📁", "calc": "🧮", "url": "🌐", "web": "🔎",
+                 "info": "ℹ", "command": "⌘"}
+LAUNCH_TRACKED_KINDS = {"app", "system", "file", "folder"}
+
+class Result:
+    __slots__ = ("kind", "id", "name", "detail", "icon", "score", "size", "mtime", "icon_source")
+
+    def __init__(self, kind, id, name, detail=None, icon=None, score=0.0, size=None, mtime=None,
+                 icon_source=None):
+        self.kind = kind      # key into RESULT_ACTIONS
+        self.id = id          # what the action acts on: path, value, url or query
+        self.name = name
+        self.detail = detail  # subtitle; defaults to the kind
+        # None for apps means "load the real icon from icon_source (or id)"
+        self.icon = icon if icon is not None else RESULT_GLYPHS.get(kind)
+        self.score = score
+        self.size = size      # bytes, files only; None if unknown
+        self.mtime = mtime    # epoch seconds; None if unknown
+        self.icon_source = icon_source  # icon key to load when it isn't id (shortcuts)
+
+    def __repr__(self):
+        return f"Result({self.kind!r}, {self.id!r}, {self.name!r})"
+
+def _format_size(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+def create_file_result(full_path, file_type, is_dir=None, size=None, mtime=None, score=0.0):
+    """Create a result for a file/folder hit from metadata captured by the
+    backend; file_type (the backend's mode) decides when is_dir is unknown"""
+    kind = "folder" if (file_type == "folder" if is_dir is None else is_dir) else "file"
+    detail = [kind]
+    if size is not None and kind == "file":
+        detail.append(_format_size(size))
+    if mtime is not None:
+        detail.append(time.strftime("%Y-%m-%d", time.localtime(mtime)))
+    return Result(kind, full_path, os.path.basename(full_path), detail=" · ".join(detail),
+                  score=score, size=size, mtime=mtime)
+
+def file_results(entries, file_type, scores=None):
+    if scores is None:
+        scores = itertools.repeat(0.0)
+    return [create_file_result(path, file_type, is_dir, size, mtime, score)
+            for (path, is_dir, size, mtime, _), score in zip(entries, scores)]
+
+def _open_folder(full_path):
+    try:
+        os.startfile(full_path)
+    except Exception as e:
+        print(f"[spotlight] Error opening {full_path}: {e}")
 
-    def _open_with_edge(url):
-        for exe in [
-            r"C:\\Program Files\\Microsoft\\Edge\\Application\\msedge.exe",
-            r"C:\\Program Files (x86)\\Microsoft\\Edge\\Application\\msedge.exe",
-            "msedge.exe"
-        ]:
-            try:
-                subprocess.Popen([exe, url], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                return True
-            except Exception:
-                continue
-        return False
+def _reveal_file(full_path):
+    try:
+        # Open Explorer with the file selected
+        subprocess.run(["explorer", "/select,", full_path], check=False)
+    except Exception as e:
+        print(f"[spotlight] Error opening {full_path}: {e}")
+        try:
+            os.startfile(full_path)
+        except:
+            pass
 
-    def _open_with_chrome(url):
-        for exe in [
-            r"C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
-            r"C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe",
-            "chrome.exe"
-        ]:
-            try:
-                subprocess.Popen([exe, url], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                return True
-            except Exception:
-                continue
-        return False
+def _launch_app(path):
+    os.startfile(path)
 
-    def _open_with_firefox(url):
-        for exe in [
-            r"C:\\Program Files\\Mozilla Firefox\\firefox.exe",
-            r"C:\\Program Files (x86)\\Mozilla Firefox\\firefox.exe",
-            "firefox.exe"
-        ]:
-            try:
-                subprocess.Popen([exe, url], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                return True
-            except Exception:
-                continue
-        return False
+def _launch_system(path):
+    win32api.ShellExecute(0, "open", path, None, None, 1)
 
-    def load_prefs():
-        try:
-            if os.path.exists(PREFS_PATH):
-                with open(PREFS_PATH, "r", encoding="utf-8") as f:
-                    return json.load(f)
-        except Exception:
-            pass
-        return {}
+def _web_search(q):
+    open_url("https://www.google.com/search?q=" + q)
+
+RESULT_ACTIONS = {
+    "app": _launch_app,
+    "system": _launch_system,
+    "file": _reveal_file,
+    "folder": _open_folder,
+    "calc": safe_copy,
+    "url": open_url,
+    "web": _web_search,
+}
 
-    def save_prefs(prefs):
+# ========== PDF CHOOSER ==========
+
+def show_pdf_chooser(p):
+    url = pathlib.Path(p).resolve().as_uri()
+    chooser = Toplevel(search_window)
+    chooser.title("Open PDF with…")
+    chooser.configure(bg=COLORS["win_bg"])
+    chooser.attributes("-topmost", True)
+    chooser.resizable(False, False)
+    chooser.geometry("420x260+{}+{}".format(_origin_x + 160, _origin_y + 100))
+    chooser.grab_set()
+    chooser.focus_force()
+    title = tk.Label(chooser, text=os.path.basename(p), bg=COLORS["win_bg"], fg=COLORS["entry_fg"], font=("Segoe UI", 11))
+    title.pack(pady=(12, 8))
+
+    # Usually already detected in the background, so the chooser renders instantly
+    options = list(get_browser_candidates())
+
+    # Listbox is keyboard-focusable and supports arrow navigation
+    list_frame = tk.Frame(chooser, bg=COLORS["win_bg"])
+    list_frame.pack(fill="both", expand=True, padx=12)
+
+    scrollbar = tk.Scrollbar(list_frame, orient="vertical")
+    lb = tk.Listbox(list_frame, selectmode="single", activestyle="none",
+                    bg=COLORS["entry_bg"], fg=COLORS["entry_fg"], highlightthickness=0,
+                    bd=0, exportselection=False, yscrollcommand=scrollbar.set, font=("Segoe UI", 10))
+    scrollbar.config(command=lb.yview)
+    scrollbar.pack(side="right", fill="y")
+    lb.pack(fill="both", expand=True)
+
+    for label, exe in options:
+        lb.insert(tk.END, label)
+
+    # Select first item and focus listbox so arrow keys work immediately
+    if lb.size() > 0:
+        lb.selection_set(0)
+        lb.activate(0)
+
+    # Ensure listbox gets focus slightly after the chooser is shown
+    def _focus_listbox():
         try:
-            with open(PREFS_PATH, "w", encoding="utf-8") as f:
-                json.dump(prefs, f)
+            lb.focus_set()
+            # make sure selection is visible
+            if lb.curselection():
+                lb.see(lb.curselection()[0])
+            else:
+                lb.see(0)
         except Exception:
             pass
-
-    def show_pdf_chooser(p):
-        url = pathlib.Path(p).resolve().as_uri()
-        chooser = Toplevel(search_window)
-        chooser.title("Open PDF with…")
-        chooser.configure(bg=COLORS["win_bg"])
-        chooser.attributes("-topmost", True)
-        chooser.resizable(False, False)
-        chooser.geometry("420x260+{}+{}".format(_origin_x + 160, _origin_y + 100))
-        chooser.grab_set()
-        chooser.focus_force()
-        title = tk.Label(chooser, text=os.path.basename(p), bg=COLORS["win_bg"], fg=COLORS["entry_fg"], font=("Segoe UI", 11))
-        title.pack(pady=(12, 8))
-
-        # Use pre-detected browsers to render chooser instantly
-        options = list(BROWSER_CANDIDATES)
-
-        # Listbox is keyboard-focusable and supports arrow navigation
-        list_frame = tk.Frame(chooser, bg=COLORS["win_bg"])
-        list_frame.pack(fill="both", expand=True, padx=12)
-
-        scrollbar = tk.Scrollbar(list_frame, orient="vertical")
-        lb = tk.Listbox(list_frame, selectmode="single", activestyle="none",
-                        bg=COLORS["entry_bg"], fg=COLORS["entry_fg"], highlightthickness=0,
-                        bd=0, exportselection=False, yscrollcommand=scrollbar.set, font=("Segoe UI", 10))
-        scrollbar.config(command=lb.yview)
-        scrollbar.pack(side="right", fill="y")
-        lb.pack(fill="both", expand=True)
-
-        for label, exe in options:
-            lb.insert(tk.END, label)
-
-        # Select first item and focus listbox so arrow keys work immediately
-        if lb.size() > 0:
-            lb.selection_set(0)
-            lb.activate(0)
-
-        # Ensure listbox gets focus slightly after the chooser is shown
-        def _focus_listbox():
-            try:
-                lb.focus_set()
-                # make sure selection is visible
-                if lb.curselection():
-                    lb.see(lb.curselection()[0])
-                else:
-                    lb.see(0)
-            except Exception:
-                pass
-        chooser.after(30, _focus_listbox)
-
-        remember_var = tk.IntVar(value=0)
-        remember = tk.Checkbutton(chooser, text="Always use this option for PDFs",
-                                  variable=remember_var,
-                                  bg=COLORS["win_bg"], fg=COLORS["entry_fg"], selectcolor=COLORS["entry_bg"], anchor="w")
-        remember.pack(pady=(6, 4), padx=12, anchor="w")
-
-        def do_open(always=False):
-            sel = lb.curselection()
-            idx = int(sel[0]) if sel else 0
-            label, exe = options[idx]
-            succeeded = False
-            try:
-                # If None -> default browser via webbrowser
-                if exe is None:
-                    succeeded = webbrowser.open(pathlib.Path(p).resolve().as_uri(), new=0, autoraise=True)
-                    print(f"[open] attempted default browser for {p}: {succeeded}")
-                elif exe == "__START__":
-                    try:
-                        os.startfile(p)
-                        succeeded = True
-                        print(f"[open] used os.startfile for {p}")
-                    except Exception as e:
-                        print(f"[open] os.startfile failed: {e}")
-                else:
-                    # Try launching exe with file path (some browsers prefer a path over file:// URI)
-                    try:
-                        subprocess.Popen([exe, str(pathlib.Path(p).resolve())], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                        succeeded = True
-                        print(f"[open] launched {exe} {p}")
-                    except Exception as e:
-                        print(f"[open] failed to Popen {exe} with path, trying URI: {e}")
-                        try:
-                            subprocess.Popen([exe, pathlib.Path(p).resolve().as_uri()], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                            succeeded = True
-                            print(f"[open] launched {exe} with URI {p}")
-                        except Exception as e2:
-                            print(f"[open] failed to Popen {exe} with URI: {e2}")
-            except Exception as e:
-                print(f"[open] unexpected error opening {p} with {label}: {e}")
-
-            if not succeeded:
-                # Try os.startfile as a final fallback
+    chooser.after(30, _focus_listbox)
+
+    remember_var = tk.IntVar(value=0)
+    remember = tk.Checkbutton(chooser, text="Always use this option for PDFs",
+                              variable=remember_var,
+                              bg=COLORS["win_bg"], fg=COLORS["entry_fg"], selectcolor=COLORS["entry_bg"], anchor="w")
+    remember.pack(pady=(6, 4), padx=12, anchor="w")
+
+    def do_open(always=False):
+        sel = lb.curselection()
+        idx = int(sel[0]) if sel else 0
+        label, exe = options[idx]
+        succeeded = False
+        try:
+            # If None -> default browser via webbrowser
+            if exe is None:
+                succeeded = webbrowser.open(pathlib.Path(p).resolve().as_uri(), new=0, autoraise=True)
+                print(f"[open] attempted default browser for {p}: {succeeded}")
+            elif exe == "__START__":
                 try:
                     os.startfile(p)
                     succeeded = True
-                    print(f"[open] fallback os.startfile succeeded for {p}")
+                    print(f"[open] used os.startfile for {p}")
+                except Exception as e:
+                    print(f"[open] os.startfile failed: {e}")
+            else:
+                # Try launching exe with file path (some browsers prefer a path over file:// URI)
+                try:
+                    subprocess.Popen([exe, str(pathlib.Path(p).resolve())], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                    succeeded = True
+                    print(f"[open] launched {exe} {p}")
                 except Exception as e:
-                    print(f"[open] fallback os.startfile failed: {e}")
+                    print(f"[open] failed to Popen {exe} with path, trying URI: {e}")
+                    try:
+                        subprocess.Popen([exe, pathlib.Path(p).resolve().as_uri()], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                        succeeded = True
+                        print(f"[open] launched {exe} with URI {p}")
+                    except Exception as e2:
+                        print(f"[open] failed to Popen {exe} with URI: {e2}")
+        except Exception as e:
+            print(f"[open] unexpected error opening {p} with {label}: {e}")
 
-            if remember_var.get() == 1 or always:
-                prefs = load_prefs()
-                prefs["pdf_default"] = options[idx][0]
-                save_prefs(prefs)
+        if not succeeded:
+            # Try os.startfile as a final fallback
+            try:
+                os.startfile(p)
+                succeeded = True
+                print(f"[open] fallback os.startfile succeeded for {p}")
+            except Exception as e:
+                print(f"[open] fallback os.startfile failed: {e}")
 
-            chooser.destroy()
+        if remember_var.get() == 1 or always:
+            prefs.set("pdf_default", options[idx][0])
 
-        # Buttons
-        btn_frame = tk.Frame(chooser, bg=COLORS["win_bg"])
-        btn_frame.pack(fill="x", pady=(0,10), padx=12)
-        once_btn = tk.Button(btn_frame, text="Open Once", command=lambda: do_open(always=False), bg=COLORS["entry_bg"], fg=COLORS["entry_fg"], relief="flat")
-        always_btn = tk.Button(btn_frame, text="Always & Open", command=lambda: do_open(always=True), bg=COLORS["selected_bg"], fg=COLORS["selected_fg"], relief="flat")
-        once_btn.pack(side="right", padx=(6,0))
-        always_btn.pack(side="right")
+        chooser.destroy()
 
-        # Keyboard bindings: Enter/double-click to open, Escape to cancel
-        def _on_enter(ev=None):
-            do_open(always=False)
+    # Buttons
+    btn_frame = tk.Frame(chooser, bg=COLORS["win_bg"])
+    btn_frame.pack(fill="x", pady=(0,10), padx=12)
+    once_btn = tk.Button(btn_frame, text="Open Once", command=lambda: do_open(always=False), bg=COLORS["entry_bg"], fg=COLORS["entry_fg"], relief="flat")
+    always_btn = tk.Button(btn_frame, text="Always & Open", command=lambda: do_open(always=True), bg=COLORS["selected_bg"], fg=COLORS["selected_fg"], relief="flat")
+    once_btn.pack(side="right", padx=(6,0))
+    always_btn.pack(side="right")
 
-        def _on_double(ev=None):
-            do_open(always=False)
+    # Keyboard bindings: Enter/double-click to open, Escape to cancel
+    def _on_enter(ev=None):
+        do_open(always=False)
 
-        def _on_escape(ev=None):
-            chooser.destroy()
+    def _on_double(ev=None):
+        do_open(always=False)
 
-        def _move_down(ev=None):
-            try:
-                cur = lb.curselection()
-                idx = int(cur[0]) if cur else -1
-                if idx < lb.size() - 1:
-                    lb.selection_clear(0, tk.END)
-                    lb.selection_set(idx + 1)
-                    lb.activate(idx + 1)
-                    lb.see(idx + 1)
-                return "break"
-            except Exception:
-                return None
+    def _on_escape(ev=None):
+        chooser.destroy()
 
-        def _move_up(ev=None):
-            try:
-                cur = lb.curselection()
-                idx = int(cur[0]) if cur else 0
-                if idx > 0:
-                    lb.selection_clear(0, tk.END)
-                    lb.selection_set(idx - 1)
-                    lb.activate(idx - 1)
-                    lb.see(idx - 1)
-                return "break"
-            except Exception:
-                return None
-
-        lb.bind('<Double-Button-1>', _on_double)
-        lb.bind('<Return>', _on_enter)
-        lb.bind('<Escape>', _on_escape)
-        lb.bind('<Down>', _move_down)
-        lb.bind('<Up>', _move_up)
-
-        # Ensure the chooser is visible and gets focus immediately
-        chooser.lift()
-        chooser.focus_force()
-
-    def get_browser_exe_by_label(lbl):
-        for label, exe in BROWSER_CANDIDATES:
-            if label == lbl:
-                return exe
-        return None
+    def _move_down(ev=None):
+        try:
+            cur = lb.curselection()
+            idx = int(cur[0]) if cur else -1
+            if idx < lb.size() - 1:
+                lb.selection_clear(0, tk.END)
+                lb.selection_set(idx + 1)
+                lb.activate(idx + 1)
+                lb.see(idx + 1)
+            return "break"
+        except Exception:
+            return None
 
-    def try_open_with_label(label, exe, filepath, url):
-        """Try to open filepath/url using exe (None means default browser), return True on success"""
+    def _move_up(ev=None):
         try:
-            if exe is None:
-                # default browser
-                ok = webbrowser.open(url, new=0, autoraise=True)
-                print(f"[open] attempted default browser for {filepath}: {ok}")
-                return bool(ok)
-            if exe == "__START__":
-                os.startfile(filepath)
-                print(f"[open] used os.startfile for {filepath}")
-                return True
-            # explicit exe path
-            try:
-                subprocess.Popen([exe, url], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                print(f"[open] launched {exe} {url}")
-                return True
-            except Exception as e:
-                print(f"[open] failed to Popen {exe}: {e}")
-                return False
-        except Exception as e:
-            print(f"[open] unexpected error opening {filepath} with {label}: {e}")
-            return False
+            cur = lb.curselection()
+            idx = int(cur[0]) if cur else 0
+            if idx > 0:
+                lb.selection_clear(0, tk.END)
+                lb.selection_set(idx - 1)
+                lb.activate(idx - 1)
+                lb.see(idx - 1)
+            return "break"
+        except Exception:
+            return None
 
-    def open_action():
-        if not os.path.exists(full_path):
-            return
+    lb.bind('<Double-Button-1>', _on_double)
+    lb.bind('<Return>', _on_enter)
+    lb.bind('<Escape>', _on_escape)
+    lb.bind('<Down>', _move_down)
+    lb.bind('<Up>', _move_up)
+
+    # Ensure the chooser is visible and gets focus immediately
+    chooser.lift()
+    chooser.focus_force()
+
+def get_browser_exe_by_label(lbl):
+    for label, exe in get_browser_candidates():
+        if label == lbl:
+            return exe
+    return None
+
+def try_open_with_label(label, exe, filepath, url):
+    """Try to open filepath/url using exe (None means default browser), return True on success"""
+    try:
+        if exe is None:
+            # default browser
+            ok = webbrowser.open(url, new=0, autoraise=True)
+            print(f"[open] attempted default browser for {filepath}: {ok}")
+            return bool(ok)
+        if exe == "__START__":
+            os.startfile(filepath)
+            print(f"[open] used os.startfile for {filepath}")
+            return True
+        # explicit exe path
         try:
-            if is_dir:
-                os.startfile(full_path)
-            else:
-                # Open Explorer with the file selected
-                subprocess.run(["explorer", "/select,", full_path], check=False)
+            subprocess.Popen([exe, url], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            print(f"[open] launched {exe} {url}")
+            return True
         except Exception as e:
-            print(f"[spotlight] Error opening {full_path}: {e}")
-            try:
-                os.startfile(full_path)
-            except:
-                pass
-    
-    return {
-        "name": name,
-        "path": full_path,
-        "type": result_type,
-        "icon": icon_char,
-        "action": open_action
-    }
+            print(f"[open] failed to Popen {exe}: {e}")
+            return False
+    except Exception as e:
+        print(f"[open] unexpected error opening {filepath} with {label}: {e}")
+        return False
 
 # ========== UI CREATION ==========
 
 def create_search_window():
-    global search_window, entry, canvas, placeholder_label, _default_icon
+    global search_window, entry, canvas, placeholder_label, _default_icon, _toplevel_hwnd
     search_window = tk.Tk()
     search_window.withdraw()
     search_window.overrideredirect(True)
@@ -985,12 +3027,12 @@ def create_search_window():
     style |= 0x00000080
     style &= ~0x00040000
     ctypes.windll.user32.SetWindowLongW(hwnd, -20, style)
+    _toplevel_hwnd = hwnd
 
     search_window.update_idletasks()
     set_origin_for_entry()
 
     try:
-        from PIL import ImageDraw
         img = Image.new("RGBA", (ICON_SIZE, ICON_SIZE), (60, 60, 60))
         draw = ImageDraw.Draw(img)
         draw.text((ICON_SIZE//3, ICON_SIZE//4), "A", fill=(200, 200, 200))
@@ -1022,136 +3064,552 @@ def create_search_window():
                      selectbackground=COLORS["selected_bg"], selectforeground=COLORS["selected_fg"])
     entry.pack(fill="both", expand=True)
 
-    search_hint = "apps, calc, url"
+    search_hint = "apps, calc, url  ·  f files  ·  d folders  ·  : commands"
     placeholder_label = tk.Label(frame, text=search_hint,
                                  font=("Consolas", 13), bg=COLORS["entry_bg"],
                                  fg=COLORS["placeholder"], anchor="w")
     placeholder_label.place(x=4, y=6)
 
     setup_bindings()
+    _build_result_rows()
 
-def clear_results():
-    global result_widgets
-    for w in result_widgets:
-        w["frame"].destroy()
-    result_widgets = []
-
-def show_results(results):
-    global result_widgets, search_results, selected_index
-    clear_results()
-    search_results = results
-    selected_index = 0 if results else -1
-
-    if not results:
-        search_window.geometry(f"{WINDOW_WIDTH}x{ENTRY_HEIGHT}+{_origin_x}+{_origin_y}")
-        return
-
-    for r in results:
-        if r.get("icon") is None:
-            r["icon"] = extract_icon(r.get("path", "")) or _default_icon
-
-    new_h = ENTRY_HEIGHT + len(results) * RESULT_ITEM_HEIGHT + 20
-    sw = search_window.winfo_screenheight()
-    origin_y = min(_origin_y, sw - new_h - 20)
-    search_window.geometry(f"{WINDOW_WIDTH}x{new_h}+{_origin_x}+{origin_y}")
-
+def _build_result_rows():
+    """Create the MAX_RESULTS row widgets once; show_results reconfigures them in place."""
     top_y = ENTRY_HEIGHT + 8
-    for i, r in enumerate(results):
+    for i in range(MAX_RESULTS):
         bg = COLORS["result_bg"] if (i % 2 == 0) else COLORS["result_alt"]
         frame = tk.Frame(search_window, bg=bg, height=RESULT_ITEM_HEIGHT, bd=0)
-        frame.place(x=16, y=top_y + i * RESULT_ITEM_HEIGHT, width=WINDOW_WIDTH - 32, height=RESULT_ITEM_HEIGHT)
 
-        icon_to_show = r.get("icon") or _default_icon
-        if isinstance(icon_to_show, ImageTk.PhotoImage):
-            icon_label = tk.Label(frame, image=icon_to_show, bg=bg)
-            icon_label.image = icon_to_show
-        else:
-            icon_text = icon_to_show if isinstance(icon_to_show, str) else "📋"
-            icon_label = tk.Label(frame, text=icon_text, font=("Segoe UI Symbol", 16), bg=bg, fg=COLORS["entry_fg"])
+        icon_label = tk.Label(frame, font=("Segoe UI Symbol", 16), bg=bg, fg=COLORS["entry_fg"])
         icon_label.place(x=12, y=12, width=36)
 
-        title_label = tk.Label(frame, text=r["name"], font=("Segoe UI", 12), bg=bg, fg=COLORS["entry_fg"], anchor="w")
+        title_label = tk.Label(frame, font=("Segoe UI", 12), bg=bg, fg=COLORS["entry_fg"], anchor="w")
         title_label.place(x=56, y=8, width=WINDOW_WIDTH - 220)
 
-        subtype = tk.Label(frame, text=r.get("type", ""), font=("Segoe UI", 9), bg=bg, fg=COLORS["subtle_text"], anchor="w")
+        subtype = tk.Label(frame, font=("Segoe UI", 9), bg=bg, fg=COLORS["subtle_text"], anchor="w")
         subtype.place(x=56, y=30, width=WINDOW_WIDTH - 220)
 
-        def _on_click(ev, idx=i):
-            select_result(idx)
+        def _on_click(ev, row_idx=i):
+            select_result(_scroll_top + row_idx)
             launch_selected()
         for w in (frame, icon_label, title_label, subtype):
             w.bind("<Button-1>", _on_click)
 
-        result_widgets.append({"frame": frame, "icon": icon_label, "title": title_label, "sub": subtype})
-    select_result(selected_index)
+        _row_pool.append({"frame": frame, "icon": icon_label, "title": title_label, "sub": subtype,
+                          "y": top_y + i * RESULT_ITEM_HEIGHT, "content": None})
 
-def select_result(idx):
-    global selected_index
-    if not result_widgets: return
-    idx = max(0, min(idx, len(result_widgets) - 1))
+def _set_visible_rows(count):
+    """Place/forget pooled rows and resize the window, only when the count changes."""
+    global result_widgets, _visible_rows
+    if count == _visible_rows:
+        return
+    for i, row in enumerate(_row_pool):
+        if i < count and not i < _visible_rows:
+            row["frame"].place(x=16, y=row["y"], width=WINDOW_WIDTH - 32, height=RESULT_ITEM_HEIGHT)
+        elif i >= count and i < _visible_rows:
+            row["frame"].place_forget()
+    if count:
+        new_h = ENTRY_HEIGHT + count * RESULT_ITEM_HEIGHT + 20
+        sw = search_window.winfo_screenheight()
+        origin_y = min(_origin_y, sw - new_h - 20)
+        search_window.geometry(f"{WINDOW_WIDTH}x{new_h}+{_origin_x}+{origin_y}")
+    else:
+        search_window.geometry(f"{WINDOW_WIDTH}x{ENTRY_HEIGHT}+{_origin_x}+{_origin_y}")
+    _visible_rows = count
+    result_widgets = _row_pool[:count]
+
+def clear_results():
+    _set_visible_rows(0)
+
+def _set_row_icon(row, icon):
+    if ImageTk and isinstance(icon, ImageTk.PhotoImage):
+        row["icon"].configure(image=icon, text="")
+        row["icon"].image = icon
+    else:
+        row["icon"].configure(image="", text=icon if isinstance(icon, str) else "📋")
+        row["icon"].image = None
+
+def _patch_row_icon(generation, idx, result, img):
+    result.icon = img
+    row_idx = idx - _scroll_top
+    if generation != _render_generation or not 0 <= row_idx < len(result_widgets) or img is None:
+        return
+    row = result_widgets[row_idx]
+    _set_row_icon(row, img)
+    row["content"] = (id(img), result.name, result.detail or result.kind)
+
+def _render_rows():
+    """Bind the pooled rows to search_results[_scroll_top:_scroll_top + MAX_RESULTS]."""
+    generation = _render_generation
+    _set_visible_rows(max(0, min(MAX_RESULTS, len(search_results) - _scroll_top)))
+
+    # Icons not yet in memory render as the placeholder and are patched in
+    # by the async icon pipeline; stale patches are dropped by generation.
+    can_load_icons = has_pywin32() and bool(Image and ImageTk)
+    for i, row in enumerate(result_widgets):
+        idx = _scroll_top + i
+        r = search_results[idx]
+        if r.icon is None and can_load_icons:
+            r.icon = request_icon(r.icon_source or r.id,
+                                  lambda img, idx=idx, r=r: _patch_row_icon(generation, idx, r, img))
+        icon_to_show = r.icon or _default_icon
+        subtitle = r.detail or r.kind
+        content = (id(icon_to_show), r.name, subtitle)
+        if row["content"] == content:
+            continue
+        _set_row_icon(row, icon_to_show)
+        row["title"].configure(text=r.name)
+        row["sub"].configure(text=subtitle)
+        row["content"] = content
+
+def show_results(results, more=None):
+    """Show results; `more` is an optional iterator of further results that is
+    pulled a page at a time, off the Tk thread, as the list is scrolled."""
+    global search_results, selected_index, _render_generation, _scroll_top
+    global _result_source, _result_source_loading
+    search_results = list(results)
+    selected_index = 0 if search_results else -1
+    _scroll_top = 0
+    _result_source = more
+    _result_source_loading = False
+    _render_generation += 1
+
+    if not search_results:
+        _set_visible_rows(0)
+        _apply_selection()
+        return
+
+    _render_rows()
+    select_result(selected_index, immediate=True)
+    _maybe_pull_more()
+
+def _maybe_pull_more():
+    """Fetch the next page from the result source when the viewport nears the end."""
+    global _result_source_loading
+    if _result_source is None or _result_source_loading:
+        return
+    if _scroll_top + MAX_RESULTS + RESULT_PREFETCH_ROWS < len(search_results):
+        return
+    _result_source_loading = True
+    source, generation = _result_source, _render_generation
+
+    def _pull():
+        try:
+            page = list(itertools.islice(source, RESULT_PAGE_SIZE))
+        except Exception as e:
+            print(f"[spotlight] result source failed: {e}")
+            page = []
+        search_window.after(0, lambda: _append_results(generation, page))
+    threading.Thread(target=_pull, daemon=True).start()
+
+def _append_results(generation, page):
+    global _result_source, _result_source_loading
+    if generation != _render_generation:
+        return
+    _result_source_loading = False
+    if len(page) < RESULT_PAGE_SIZE:
+        _result_source = None
+    if page:
+        search_results.extend(page)
+        if len(result_widgets) < MAX_RESULTS:
+            _render_rows()
+            _apply_selection()
+    _maybe_pull_more()
+
+def scroll_results(delta):
+    """Scroll the viewport by delta rows without moving the selection."""
+    global _scroll_top
+    top = max(0, min(_scroll_top + delta, len(search_results) - MAX_RESULTS))
+    if top == _scroll_top:
+        return
+    _scroll_top = top
+    _render_rows()
+    _apply_selection()
+    _maybe_pull_more()
+
+def _style_row(i, selected):
+    widgets = _row_pool[i]
+    f, title, sub = widgets["frame"], widgets["title"], widgets["sub"]
+    if selected:
+        f.configure(bg=COLORS["selected_bg"])
+        title.configure(bg=COLORS["selected_bg"], fg=COLORS["selected_fg"])
+        sub.configure(bg=COLORS["selected_bg"], fg=COLORS["selected_border"])
+    else:
+        bg = COLORS["result_bg"] if (i % 2 == 0) else COLORS["result_alt"]
+        f.configure(bg=bg)
+        title.configure(bg=bg, fg=COLORS["entry_fg"])
+        sub.configure(bg=bg, fg=COLORS["subtle_text"])
+
+def _apply_selection():
+    """Restyle only the previously and newly highlighted rows."""
+    global _highlighted_row, _selection_redraw_pending
+    _selection_redraw_pending = False
+    target = selected_index - _scroll_top
+    if not 0 <= target < len(result_widgets):
+        target = -1
+    if target == _highlighted_row:
+        return
+    if _highlighted_row >= 0:
+        _style_row(_highlighted_row, False)
+    if target >= 0:
+        _style_row(target, True)
+    _highlighted_row = target
+
+def select_result(idx, immediate=False):
+    """Move the selection, scrolling it into view; the restyle is coalesced
+    into one idle callback so held-down arrow keys only repaint the final
+    pair of rows."""
+    global selected_index, _selection_redraw_pending, _scroll_top
+    if not search_results: return
+    idx = max(0, min(idx, len(search_results) - 1))
     selected_index = idx
-    for i, widgets in enumerate(result_widgets):
-        f, icon, title, sub = widgets["frame"], widgets["icon"], widgets["title"], widgets["sub"]
-        if i == idx:
-            f.configure(bg=COLORS["selected_bg"])
-            title.configure(bg=COLORS["selected_bg"], fg=COLORS["selected_fg"])
-            sub.configure(bg=COLORS["selected_bg"], fg=COLORS["selected_border"])
-        else:
-            bg = COLORS["result_bg"] if (i % 2 == 0) else COLORS["result_alt"]
-            f.configure(bg=bg)
-            title.configure(bg=bg, fg=COLORS["entry_fg"])
-            sub.configure(bg=bg, fg=COLORS["subtle_text"])
+    if idx < _scroll_top or idx >= _scroll_top + MAX_RESULTS:
+        _scroll_top = idx if idx < _scroll_top else idx - MAX_RESULTS + 1
+        _render_rows()
+        _maybe_pull_more()
+        immediate = True
+    if immediate:
+        _apply_selection()
+    elif not _selection_redraw_pending:
+        _selection_redraw_pending = True
+        search_window.after_idle(_apply_selection)
 
 # ========== SEARCH LOGIC ==========
 
+def _more_app_results(q, catalog, skip):
+    """Lazily yield app matches ranked below the first `skip`; the full
+    ranking only runs if the user scrolls that far."""
+    matches = process.extract(q, catalog.names, scorer=fuzz.WRatio, limit=None, score_cutoff=40)
+    for _, score, idx in matches[skip:]:
+        yield catalog.result(idx, score)
+
+# ========== FILE RANKING ==========
+
+# Backends return hits in their own order (index order, Everything's sort, walk
+# order), so file and folder hits are re-scored against the query before they
+# are shown. Every signal is computed column-wise over the whole candidate
+# batch: rapidfuzz scores each column in one C call, substring and noise-dir
+# hits come from a single regex pass over the newline-joined column.
+FILE_RANK_CANDIDATES = 100     # hits fetched per query and ranked before the first page is shown
+RANK_DIR_WEIGHT = 0.35         # a directory match counts this much of a basename match
+RANK_CONTIGUOUS_BONUS = 15.0   # query occurs verbatim in the basename
+RANK_BOUNDARY_BONUS = 10.0     # ... and starts at a word boundary
+RANK_DEPTH_FREE = 3            # path depth that goes unpenalized
+RANK_DEPTH_PENALTY = 2.0       # per directory level beyond that
+RANK_NOISE_PENALTY = 30.0      # hit lives under a temp/cache/vendor directory
+RANK_RECENCY_BONUS = 12.0      # bonus for a file modified just now...
+RANK_RECENCY_HALF_LIFE_DAYS = 30.0  # ...halving every this many days
+_RANK_BOUNDARY_CHARS = frozenset(" _-.()[]{}\n")
+_RANK_NOISE_DIRS_RE = re.compile(
+    r"(?:^|[\\/])(?:temp|tmp|cache|caches|\.cache|inetcache|node_modules|\.git|\.svn|"
+    r"__pycache__|site-packages|\.venv|venv|\$recycle\.bin|crashdumps|prefetch)(?=[\\/]|$)",
+    re.M)
+
+def _column_hits(pattern, column, starts):
+    """Indexes of column items matched by pattern, from one finditer over
+    the newline-joined column; yields (index, offset within the item, joined)."""
+    joined = "\n".join(column)
+    for m in pattern.finditer(joined):
+        i = bisect.bisect_right(starts, m.start()) - 1
+        yield i, m.start() - starts[i], joined
+
+def rank_file_entries(query, entries, now=None):
+    """Order (path, is_dir, size, mtime, seen_at) entries best first for query;
+    returns (entries, scores). Ties keep the backend's order."""
+    n = len(entries)
+    if not n:
+        return [], []
+    now = now or time.time()
+    paths = [e[0].rstrip("\\/").lower() for e in entries]
+    cuts = [max(p.rfind("\\"), p.rfind("/")) for p in paths]
+    names = [p[c + 1:] for p, c in zip(paths, cuts)]
+    dirs = [p[:max(c, 0)] for p, c in zip(paths, cuts)]
+    starts = list(itertools.accumulate((len(x) + 1 for x in names), initial=0))
+    dir_starts = list(itertools.accumulate((len(x) + 1 for x in dirs), initial=0))
+    scores = [0.0] * n
+
+    q = query.strip().lower()
+    if q:
+        if process:
+            # Fuzzy similarity: basename in full, the directory part discounted
+            for column, weight in ((names, 1.0), (dirs, RANK_DIR_WEIGHT)):
+                for _, s, i in process.extract(q, column, scorer=fuzz.partial_ratio, limit=None):
+                    scores[i] += s * weight
+        # Contiguous and word-boundary hits, per query word, best hit per item;
+        # a hit in the directory part earns the discounted contiguous bonus only
+        words = q.split()
+        for word in words:
+            pattern = re.compile(re.escape(word))
+            for i in {i for i, _, _ in _column_hits(pattern, dirs, dir_starts)}:
+                scores[i] += RANK_DIR_WEIGHT * RANK_CONTIGUOUS_BONUS / len(words)
+            contiguous, boundary = set(), set()
+            for i, offset, joined in _column_hits(pattern, names, starts):
+                contiguous.add(i)
+                if offset == 0 or joined[starts[i] + offset - 1] in _RANK_BOUNDARY_CHARS:
+                    boundary.add(i)
+            for i in contiguous:
+                scores[i] += RANK_CONTIGUOUS_BONUS / len(words)
+            for i in boundary:
+                scores[i] += RANK_BOUNDARY_BONUS / len(words)
+
+    noisy = {i for i, _, _ in _column_hits(_RANK_NOISE_DIRS_RE, dirs, dir_starts)}
+    for i in noisy:
+        scores[i] -= RANK_NOISE_PENALTY
+    decay = 1.0 / (RANK_RECENCY_HALF_LIFE_DAYS * 86400)
+    scores = [s - RANK_DEPTH_PENALTY * max(0, d.count("\\") + d.count("/") - RANK_DEPTH_FREE)
+              + (RANK_RECENCY_BONUS * 0.5 ** (max(0.0, now - e[3]) * decay) if e[3] else 0.0)
+              for s, d, e in zip(scores, dirs, entries)]
+    order = sorted(range(n), key=scores.__getitem__, reverse=True)
+    return [entries[i] for i in order], [scores[i] for i in order]
+
+def ranked_file_results(query, entries, file_type):
+    entries, scores = rank_file_entries(query, entries)
+    return file_results(entries, file_type, scores)
+
+# ========== QUERY PROVIDERS ==========
+
+# Each query is routed to the providers that can answer it: a trigger prefix
+# selects exactly one provider, otherwise the default set runs, each gated by
+# a cheap classifier. Providers return (results, more) where `more` is an
+# optional lazy iterator for show_results. Background providers (file
+# backends) run on a worker and post back if the query is still current.
+PROVIDER_WORKERS = 2
+_query_generation = 0
+_provider_pool = concurrent.futures.ThreadPoolExecutor(max_workers=PROVIDER_WORKERS,
+                                                       thread_name_prefix="provider")
+_provider_ms = {}
+
+class SearchProvider:
+    def __init__(self, name, search, prefix=None, classify=None, default=False, background=False,
+                 claim=None):
+        self.name = name
+        self.search = search          # text -> (results, more)
+        self.prefix = prefix          # trigger that routes a query here exclusively
+        self.claim = claim            # cheap test that routes an unprefixed query here exclusively
+        self.classify = classify      # cheap gate for unprefixed queries
+        self.default = default        # part of the unprefixed set
+        self.background = background  # run off the Tk thread
+
+def _info_result(name, icon="ℹ", kind="info"):
+    return Result(kind, None, name, icon=icon)
+
+def _cmd_startup():
+    total = (_startup_phases[-1][2] - _STARTUP_T0) * 1000
+    slowest = max(_startup_phases, key=lambda p: p[2] - p[1])
+    return [_info_result(f"Startup: ready in {total:.0f}ms, slowest phase {slowest[0]} "
+                         f"({(slowest[2] - slowest[1]) * 1000:.0f}ms)")]
+
+def _cmd_resetpdf():
+    prefs.set("pdf_default", None)
+    return [_info_result("PDF preference cleared.", "✔")]
+
+COMMANDS = {
+    "latency": ("show/hide latency against budget", lambda: [_info_result(f"Latency: {latency_report()}")]),
+    "startup": ("startup time by phase", _cmd_startup),
+    "icons": ("icon cache usage", lambda: [_info_result(f"Icon cache: {icon_cache_report()}")]),
+    "providers": ("search provider timings", lambda: [_info_result(f"Providers: {provider_report()}")]),
+    "cache": ("negative result cache hit rate", lambda: [_info_result(f"Negative cache: {negative_cache_report()}")]),
+    "resetpdf": ("forget the remembered PDF app", _cmd_resetpdf),
+}
+
+def search_commands(text):
+    name = text.strip().lower()
+    if name in COMMANDS:
+        return COMMANDS[name][1](), None
+    return [_info_result(f":{cmd} — {desc}", "⌘", "command")
+            for cmd, (desc, _) in COMMANDS.items() if cmd.startswith(name)], None
+
+def search_calc(text):
+    calc = calculate(text)
+    if not calc:
+        return [], None
+    return [Result("calc", calc, f"{text} → {calc}")], None
+
+def search_url(text):
+    if not is_url(text):
+        return [], None
+    return [Result("url", text, text)], None
+
+def search_apps(q):
+    results = []
+    more = None
+    catalog = apps
+    if not catalog:
+        return results, more
+    if process and fuzz:
+        # Fetch a few extra candidates so their icons can be warmed early
+        matches = process.extract(q, catalog.names, scorer=fuzz.WRatio, limit=MAX_RESULTS + ICON_HINT_EXTRA)
+        near_misses = []
+        for rank, (m, score, idx) in enumerate(matches):
+            if score >= 40:
+                if rank >= MAX_RESULTS:
+                    near_misses.append(catalog.icon_source(idx))
+                else:
+                    results.append(catalog.result(idx, score))
+        hint_icon_preload(near_misses)
+        if near_misses:
+            more = _more_app_results(q, catalog, MAX_RESULTS)
+    else:
+        needle = q.casefold()
+        for i, name in enumerate(catalog.norm_names):
+            if needle in name:
+                results.append(catalog.result(i))
+    return results, more
+
+def _more_db_results(query, mode, offset, filters=None):
+    """Lazily page further index hits with LIMIT/OFFSET as the list is scrolled;
+    each page is ranked on its own."""
+    while True:
+        rows = db_search_entries(query, mode, RESULT_PAGE_SIZE, offset, filters) or []
+        yield from ranked_file_results(query, refresh_file_meta(rows, write_back=True), mode)
+        if len(rows) < RESULT_PAGE_SIZE:
+            return
+        offset += len(rows)
+
+def _more_folder_results(query, offset, filters=None):
+    while True:
+        rows = folder_search_entries(query, RESULT_PAGE_SIZE, offset, filters) or []
+        yield from ranked_file_results(query, rows, "folder")
+        if len(rows) < RESULT_PAGE_SIZE:
+            return
+        offset += len(rows)
+
+def _first_page(results, more):
+    """Show the best MAX_RESULTS of a ranked candidate batch; the rest of the
+    batch leads the lazy source, ahead of any further pages."""
+    if len(results) <= MAX_RESULTS:
+        return results, more
+    rest = iter(results[MAX_RESULTS:])
+    return results[:MAX_RESULTS], itertools.chain(rest, more) if more else rest
+
+def _search_file_backends(text, mode):
+    text, filters = parse_file_filters(text)
+    if not text and not filters:
+        return [], None
+    # The local index pages cheaply, so it goes first; the rest is the
+    # Everything / Windows Search / os.walk fallback chain
+    # Metadata comes from the index or the backend; only unknown or stale
+    # entries are statted, in one batch on this worker thread. Each source
+    # hands back a batch of FILE_RANK_CANDIDATES that is ranked as a whole
+    if mode == "folder":
+        rows = negative_cached("folders", text, mode, filters,
+                               lambda: folder_search_entries(text, FILE_RANK_CANDIDATES, filters=filters))
+        if rows is not None:
+            more = (_more_folder_results(text, len(rows), filters)
+                    if len(rows) == FILE_RANK_CANDIDATES else None)
+            # Folder rows carry the folder-index build time, not a per-row
+            # check, so they are not re-statted; the next index run refreshes them
+            return _first_page(ranked_file_results(text, rows, mode), more)
+    rows = negative_cached("index", text, mode, filters,
+                           lambda: db_search_entries(text, mode, FILE_RANK_CANDIDATES, filters=filters))
+    if rows:
+        more = (_more_db_results(text, mode, len(rows), filters)
+                if len(rows) == FILE_RANK_CANDIDATES else None)
+        return _first_page(ranked_file_results(text, refresh_file_meta(rows, write_back=True), mode), more)
+    entries = refresh_file_meta(file_backend_search(text, mode, FILE_RANK_CANDIDATES, filters))
+    if filters:
+        entries = [e for e in entries if file_entry_matches(e, filters)]
+    return _first_page(ranked_file_results(text, entries, mode), None)
+
+def search_files(text):
+    return _search_file_backends(text, "file")
+
+def search_folders(text):
+    return _search_file_backends(text, "folder")
+
+PROVIDERS = [
+    SearchProvider("commands", search_commands, prefix=":"),
+    SearchProvider("calc", search_calc, prefix="=", default=True,
+                   classify=lambda q: _CALC_CHARS.fullmatch(q) is not None),
+    SearchProvider("url", search_url, default=True, classify=lambda q: "." in q and " " not in q),
+    SearchProvider("apps", search_apps, default=True),
+    SearchProvider("files", search_files, prefix="f ", background=True,
+                   claim=lambda q: FILE_FILTER_RE.search(q) is not None),
+    SearchProvider("folders", search_folders, prefix="d ", background=True),
+]
+
+def route_query(q):
+    """Return (providers, text, prefixed) for a stripped, non-empty query."""
+    for p in PROVIDERS:
+        if p.prefix and q.startswith(p.prefix):
+            return [p], q[len(p.prefix):].strip(), True
+    for p in PROVIDERS:
+        if p.claim and p.claim(q):
+            return [p], q, True
+    return [p for p in PROVIDERS if p.default and (p.classify is None or p.classify(q))], q, False
+
+def _run_provider(provider, text):
+    started = time.perf_counter()
+    try:
+        return provider.search(text)
+    except Exception as e:
+        print(f"[providers] {provider.name} failed: {e}")
+        return [], None
+    finally:
+        samples = _provider_ms.get(provider.name)
+        if samples is None:
+            samples = _provider_ms[provider.name] = deque(maxlen=200)
+        samples.append((time.perf_counter() - started) * 1000)
+
+def provider_report():
+    parts = []
+    for name, samples in _provider_ms.items():
+        if samples:
+            ordered = sorted(samples)
+            parts.append(f"{name} p50 {ordered[len(ordered) // 2]:.1f}ms "
+                         f"p95 {ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]:.1f}ms "
+                         f"(n={len(ordered)})")
+    return "; ".join(parts) or "no samples yet"
+
+def _run_background_providers(generation, providers, text, results, more):
+    def _work():
+        if generation != _query_generation:
+            return  # superseded while queued
+        found, found_more = list(results), more
+        for p in providers:
+            r, m = _run_provider(p, text)
+            found.extend(r)
+            found_more = found_more or m
+        search_window.after(0, lambda: _finish_background_search(generation, found, found_more, text))
+    _provider_pool.submit(_work)
+
+def _finish_background_search(generation, results, more, text):
+    if generation != _query_generation:
+        return
+    show_results(results or [_info_result(f"No matches for '{text}'")], more)
+
 def perform_search():
+    global _query_generation
+    _query_generation += 1
     q = entry.get().strip()
-    if q.strip() == ":resetpdf":
-        try:
-            if os.path.exists(PREFS_PATH):
-                prefs = {}
-                with open(PREFS_PATH, "w", encoding="utf-8") as f:
-                    json.dump(prefs, f)
-            show_results([{ "name": "PDF preference cleared.", "type": "info", "icon": "✔", "action": lambda: None }])
-        except Exception:
-            show_results([{ "name": "Could not clear preference.", "type": "error", "icon": "⚠️", "action": lambda: None }])
-        return
     if q: placeholder_label.place_forget()
     else:
         placeholder_label.place(x=4, y=6)
         show_results([]); return
 
-    results = []
-    calc = calculate(q)
-    if calc:
-        results.append({"name": f"{q} → {calc}", "type": "calc", "icon": "🧮", "action": lambda v=calc: safe_copy(v)})
-    if is_url(q):
-        results.append({"name": q, "type": "url", "icon": "🌐", "action": lambda u=q: open_url(u)})
-    
-    # Regular app search
-    if process and fuzz and apps:
-        names = [a["name"] for a in apps]
-        matches = process.extract(q, names, scorer=fuzz.WRatio, limit=MAX_RESULTS)
-        for m, score, _ in matches:
-            if score >= 40:
-                a = next((x for x in apps if x["name"] == m), None)
-                if a:
-                    action = (lambda p=a["path"]: os.startfile(p)) if a["type"] != "system" else (lambda p=a["path"]: win32api.ShellExecute(0, "open", p, None, None, 1))
-                    results.append({"name": a["name"], "type": a["type"], "icon": a["icon"], "action": action})
-    else:
-        for a in apps:
-            if q.lower() in a["name"].lower():
-                action = (lambda p=a["path"]: os.startfile(p)) if a["type"] != "system" else (lambda p=a["path"]: win32api.ShellExecute(0, "open", p, None, None, 1))
-                results.append({"name": a["name"], "type": a["type"], "icon": a["icon"], "action": action})
-    
-    if not results:
-        results.append({"name": f"Search web for '{q}'", "type": "web", "icon": "🔎", "action": lambda q=q: open_url("https://www.google.com/search?q=" + q)})
-    show_results(results[:MAX_RESULTS])
+    providers, text, prefixed = route_query(q)
+    results, more = [], None
+    background = []
+    for p in providers:
+        if p.background:
+            background.append(p)
+            continue
+        r, m = _run_provider(p, text)
+        results.extend(r)
+        more = more or m
+
+    if background:
+        _run_background_providers(_query_generation, background, text, results, more)
+        results = results + [_info_result(f"Searching for '{text}'…", "⏳")]
+    elif not results and not prefixed:
+        results.append(Result("web", q, f"Search web for '{q}'"))
+    show_results(results, more)
 
 def _debounced_search(event):
     global _search_after_id
+    note_user_activity()
     if _search_after_id: search_window.after_cancel(_search_after_id)
-    if event.keysym not in ("Up", "Down", "Return", "Escape"):
+    if event.keysym not in ("Up", "Down", "Next", "Prior", "Return", "Escape"):
         _search_after_id = search_window.after(SEARCH_DEBOUNCE_MS, perform_search)
 
 # ========== NAVIGATION ==========
@@ -1164,47 +3622,269 @@ def on_key_nav(event):
     elif event.keysym == "Up":
         if search_results: select_result(max(selected_index - 1, 0))
         return "break"
+    elif event.keysym == "Next":
+        if search_results: select_result(min(selected_index + MAX_RESULTS, len(search_results) - 1))
+        return "break"
+    elif event.keysym == "Prior":
+        if search_results: select_result(max(selected_index - MAX_RESULTS, 0))
+        return "break"
     elif event.keysym == "Return": launch_selected(); return "break"
     elif event.keysym == "Escape": hide(); return "break"
 
 def launch_selected():
     if 0 <= selected_index < len(search_results):
-        a = search_results[selected_index]
+        r = search_results[selected_index]
         try:
             # Call action first to avoid making the chooser wait while hiding/destroying TK
-            if callable(a.get("action")):
-                a["action"]()
+            action = RESULT_ACTIONS.get(r.kind)
+            if action is not None:
+                action(r.id)
+                if r.kind in LAUNCH_TRACKED_KINDS:
+                    record_launch(r.id)
         except Exception as e:
             print("[spotlight] launch error:", e)
         finally:
             # hide the launcher afterwards
             hide()
 
+# ========== STARTUP PROFILE ==========
+
+# Wall-clock phases from interpreter start of this module to "ready", in the
+# spirit of `python -X importtime`: self time per phase plus cumulative.
+_startup_phases = [("stdlib imports", _STARTUP_T0, _STARTUP_IMPORTS_DONE)]
+_startup_last = _STARTUP_IMPORTS_DONE
+
+def startup_mark(phase):
+    global _startup_last
+    now = time.perf_counter()
+    _startup_phases.append((phase, _startup_last, now))
+    _startup_last = now
+
+def warm_optional_imports(ctx):
+    """Background job: pay for the imports the first keystroke or first
+    PDF open would otherwise wait on."""
+    for module in (process, fuzz, Image, ImageTk, ImageDraw, pyperclip):
+        bool(module)
+    get_browser_candidates()
+
+def startup_report():
+    lines = ["[startup]        self ms |  cumulative | phase"]
+    for phase, start, end in _startup_phases:
+        lines.append(f"[startup] {(end - start) * 1000:14.1f} | {(end - _STARTUP_T0) * 1000:11.1f} | {phase}")
+    for name, (ms, thread) in sorted(_lazy_import_ms.items(), key=lambda kv: -kv[1][0]):
+        where = "critical path" if thread == "MainThread" else f"background ({thread})"
+        if name not in sys.modules:
+            where += ", not installed"
+        lines.append(f"[startup] {ms:14.1f} |             | lazy import {name} — {where}")
+    return "\n".join(lines)
+
+# ========== CALCULATOR ==========
+
+# Expressions are parsed once into a tree of closures and evaluated without
+# eval(). Integers are capped by bit length, exponents are checked before
+# the power is computed, and every node checks a wall-clock deadline, so
+# inputs like 9**9**9 are rejected instead of freezing the Tk thread.
+CALC_MAX_INT_BITS = 4096
+CALC_MAX_EXPONENT = 1024
+CALC_DEADLINE_MS = 5
+CALC_CACHE_SIZE = 256
+_CALC_CHARS = re.compile(r"[0-9+\-*/%().\s]+")
+_calc_cache = OrderedDict()  # expression -> compiled closure, or None if rejected
+
+class CalcLimitError(ArithmeticError):
+    pass
+
+def _calc_check(value):
+    if isinstance(value, int) and value.bit_length() > CALC_MAX_INT_BITS:
+        raise CalcLimitError("result too large")
+    return value
+
+def _calc_pow(base, exp):
+    if abs(exp) > CALC_MAX_EXPONENT:
+        raise CalcLimitError("exponent too large")
+    if isinstance(base, int) and isinstance(exp, int) and exp > 0:
+        if (abs(base).bit_length() - 1) * exp > CALC_MAX_INT_BITS:
+            raise CalcLimitError("result too large")
+    return base ** exp
+
+_CALC_BINOPS = {
+    ast.Add: lambda a, b: a + b,
+    ast.Sub: lambda a, b: a - b,
+    ast.Mult: lambda a, b: a * b,
+    ast.Div: lambda a, b: a / b,
+    ast.FloorDiv: lambda a, b: a // b,
+    ast.Mod: lambda a, b: a % b,
+    ast.Pow: _calc_pow,
+}
+_CALC_UNARYOPS = {
+    ast.UAdd: lambda a: +a,
+    ast.USub: lambda a: -a,
+}
+
+def _calc_compile(node):
+    """Turn an expression AST into a closure taking the deadline, or raise
+    ValueError for anything outside plain arithmetic."""
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = _calc_check(node.value)
+        return lambda deadline: value
+    if isinstance(node, ast.BinOp) and type(node.op) in _CALC_BINOPS:
+        op = _CALC_BINOPS[type(node.op)]
+        left, right = _calc_compile(node.left), _calc_compile(node.right)
+        def binop(deadline):
+            a, b = left(deadline), right(deadline)
+            if time.perf_counter() > deadline:
+                raise CalcLimitError("deadline exceeded")
+            return _calc_check(op(a, b))
+        return binop
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _CALC_UNARYOPS:
+        op = _CALC_UNARYOPS[type(node.op)]
+        operand = _calc_compile(node.operand)
+        return lambda deadline: op(operand(deadline))
+    raise ValueError(f"unsupported expression: {type(node).__name__}")
+
+def compile_expression(expr):
+    """Cached compile of an arithmetic expression; None if it is not one."""
+    try:
+        _calc_cache.move_to_end(expr)
+        return _calc_cache[expr]
+    except KeyError:
+        pass
+    try:
+        compiled = _calc_compile(ast.parse(expr, mode="eval").body)
+    except (SyntaxError, ValueError, CalcLimitError, RecursionError):
+        compiled = None
+    _calc_cache[expr] = compiled
+    if len(_calc_cache) > CALC_CACHE_SIZE:
+        _calc_cache.popitem(last=False)
+    return compiled
+
+def calculate(expr: str):
+    expr = expr.strip()
+    if not expr or not _CALC_CHARS.fullmatch(expr):
+        return None
+    compiled = compile_expression(expr)
+    if compiled is None:
+        return None
+    try:
+        return str(compiled(time.perf_counter() + CALC_DEADLINE_MS / 1000))
+    except (ArithmeticError, ValueError):
+        return None
+
+# ========== LATENCY BUDGET ==========
+
+# Hotkey-to-visible, hotkey-to-input-ready (entry focused) and the queueing
+# delay of the first keystroke after a show, checked against a budget.
+LATENCY_BUDGET_MS = {"visible": 50.0, "input_ready": 60.0, "first_key_delay": 16.0}
+_latency_samples = {name: deque(maxlen=200) for name in LATENCY_BUDGET_MS}
+_hotkey_pressed_at = None
+_show_started_at = None
+_awaiting_focus = False
+_awaiting_first_key = False
+
+def note_hotkey():
+    """Called on the hotkey thread so the latency clock starts at the key press."""
+    global _hotkey_pressed_at
+    _hotkey_pressed_at = time.perf_counter()
+
+def record_latency(name, ms):
+    _latency_samples[name].append(ms)
+    budget = LATENCY_BUDGET_MS[name]
+    print(f"[latency] {name} {ms:.1f}ms (budget {budget:.0f}ms){' OVER BUDGET' if ms > budget else ''}")
+
+def latency_report():
+    parts = []
+    for name, samples in _latency_samples.items():
+        if samples:
+            ordered = sorted(samples)
+            parts.append(f"{name} p50 {ordered[len(ordered) // 2]:.0f}ms "
+                         f"p95 {ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]:.0f}ms "
+                         f"/ {LATENCY_BUDGET_MS[name]:.0f}ms")
+    return "; ".join(parts) or "no samples yet"
+
+def _on_entry_focus(event):
+    global _awaiting_focus
+    if _awaiting_focus and _show_started_at is not None:
+        _awaiting_focus = False
+        record_latency("input_ready", (time.perf_counter() - _show_started_at) * 1000)
+
+def _on_first_key(event):
+    global _awaiting_first_key
+    if not _awaiting_first_key:
+        return
+    _awaiting_first_key = False
+    if os.name == "nt" and event.time:
+        # event.time is the message's GetTickCount stamp
+        delay = (ctypes.windll.kernel32.GetTickCount() - event.time) & 0xFFFFFFFF
+        record_latency("first_key_delay", float(delay))
+
 # ========== SHOW / HIDE ==========
 
+# The window is kept laid out and reset while hidden, so show() only has to
+# map it and grab focus; fades run from after() and never block input.
+_animation_after_id = None
+
+def _cancel_animation():
+    global _animation_after_id
+    if _animation_after_id:
+        search_window.after_cancel(_animation_after_id)
+        _animation_after_id = None
+
+def _animate_alpha(steps, on_done=None):
+    def _step(i):
+        global _animation_after_id
+        _animation_after_id = None
+        try:
+            search_window.attributes("-alpha", steps[i])
+        except Exception:
+            pass
+        if i + 1 < len(steps):
+            _animation_after_id = search_window.after(ANIMATION_FRAME_MS, lambda: _step(i + 1))
+        elif on_done:
+            on_done()
+    _step(0)
+
+def prewarm_window():
+    """Map the window once, fully transparent, so the first real show skips
+    window realization and initial layout."""
+    search_window.attributes("-alpha", 0.0)
+    search_window.deiconify()
+    search_window.update()
+    search_window.withdraw()
+
 def show():
+    global _window_visible, _show_started_at, _hotkey_pressed_at, _awaiting_focus, _awaiting_first_key
+    _show_started_at = _hotkey_pressed_at or time.perf_counter()
+    _hotkey_pressed_at = None
+    _window_visible = True
     if not search_window: create_search_window()
+    _cancel_animation()
     set_origin_for_entry()
+    if entry.get() or search_results:
+        # Not reset by hide() (e.g. a hide fade was interrupted)
+        entry.delete(0, tk.END)
+        perform_search()
     search_window.geometry(f"{WINDOW_WIDTH}x{ENTRY_HEIGHT}+{_origin_x}+{_origin_y}")
-    entry.delete(0, tk.END)
-    perform_search()
+    search_window.attributes("-alpha", SHOW_ALPHA_STEPS[0])
     search_window.deiconify()
     search_window.lift()
-    hwnd = search_window.winfo_id()
-    ctypes.windll.user32.SetForegroundWindow(hwnd)
+    ctypes.windll.user32.SetForegroundWindow(_toplevel_hwnd or search_window.winfo_id())
+    _awaiting_focus = _awaiting_first_key = True
     entry.focus_set()
-    try:
-        for a in (0.0, 0.25, 0.5, 0.8, 0.95):
-            search_window.attributes("-alpha", a); search_window.update()
-    except Exception: pass
+    search_window.after_idle(lambda: record_latency("visible", (time.perf_counter() - _show_started_at) * 1000))
+    _animate_alpha(SHOW_ALPHA_STEPS[1:])
 
 def hide():
     if not search_window: return
-    try:
-        for a in (0.9, 0.6, 0.3, 0.0):
-            search_window.attributes("-alpha", a); search_window.update()
-    except Exception: pass
-    search_window.withdraw()
+    _cancel_animation()
+
+    def _finish():
+        global _window_visible
+        search_window.withdraw()
+        _window_visible = False
+        # Reset while hidden so the next show has nothing to re-render
+        entry.delete(0, tk.END)
+        perform_search()
+    _animate_alpha(HIDE_ALPHA_STEPS, _finish)
 
 # ========== BINDINGS ==========
 
@@ -1215,6 +3895,11 @@ def setup_bindings():
     entry.bind("<KeyPress-Down>", on_key_nav)
     entry.bind("<KeyPress-Return>", on_key_nav)
     entry.bind("<KeyPress-Escape>", on_key_nav)
+    entry.bind("<KeyPress-Next>", on_key_nav)
+    entry.bind("<KeyPress-Prior>", on_key_nav)
+    entry.bind("<KeyPress>", _on_first_key, add="+")
+    entry.bind("<FocusIn>", _on_entry_focus)
+    search_window.bind("<MouseWheel>", lambda ev: scroll_results(-1 if ev.delta > 0 else 1))
 
     def _backspace_close(ev):
         global backspace_empty_count
@@ -1242,7 +3927,7 @@ def register_hotkey():
     except:
         pass
     try:
-        keyboard.add_hotkey(HOTKEY, lambda: _tk_call(show))
+        keyboard.add_hotkey(HOTKEY, lambda: (note_hotkey(), _tk_call(show)))
         _hotkey_registered = True
         print(f"[spotlight] hotkey {HOTKEY} registered")
     except Exception as e:
@@ -1260,11 +3945,319 @@ def hotkey_thread():
             register_hotkey()
         time.sleep(5)
 
-# ========== MAIN ==========
+# ========== BENCHMARKS ==========
 
+# `python yoi.py --bench [name ...]` runs the benchmarks below and prints
+# their numbers; with no names it runs them all.
 
-import pystray
-from PIL import Image, ImageDraw
+def _format_stats(samples_ms):
+    ordered = sorted(samples_ms)
+    n = len(ordered)
+    return (f"n={n} mean={sum(ordered) / n:.2f}ms p50={ordered[n // 2]:.2f}ms "
+            f"p95={ordered[min(n - 1, int(n * 0.95))]:.2f}ms max={ordered[-1]:.2f}ms")
+
+def _legacy_render(results, widgets):
+    """The pre-pool show_results body: destroy last frame's rows, then build a
+    frame and three labels per result. Kept only as bench_render's baseline."""
+    for w in widgets:
+        w.destroy()
+    widgets.clear()
+    new_h = ENTRY_HEIGHT + len(results) * RESULT_ITEM_HEIGHT + 20
+    search_window.geometry(f"{WINDOW_WIDTH}x{new_h}+{_origin_x}+{_origin_y}")
+    top_y = ENTRY_HEIGHT + 8
+    for i, r in enumerate(results):
+        bg = COLORS["result_bg"] if (i % 2 == 0) else COLORS["result_alt"]
+        frame = tk.Frame(search_window, bg=bg, height=RESULT_ITEM_HEIGHT, bd=0)
+        frame.place(x=16, y=top_y + i * RESULT_ITEM_HEIGHT, width=WINDOW_WIDTH - 32, height=RESULT_ITEM_HEIGHT)
+        icon_label = tk.Label(frame, text=r.icon, font=("Segoe UI Symbol", 16), bg=bg, fg=COLORS["entry_fg"])
+        icon_label.place(x=12, y=12, width=36)
+        title_label = tk.Label(frame, text=r.name, font=("Segoe UI", 12), bg=bg, fg=COLORS["entry_fg"], anchor="w")
+        title_label.place(x=56, y=8, width=WINDOW_WIDTH - 220)
+        subtype = tk.Label(frame, text=r.detail or r.kind, font=("Segoe UI", 9), bg=bg,
+                           fg=COLORS["subtle_text"], anchor="w")
+        subtype.place(x=56, y=30, width=WINDOW_WIDTH - 220)
+        for w in (frame, icon_label, title_label, subtype):
+            w.bind("<Button-1>", lambda ev, idx=i: None)
+        widgets.append(frame)
+
+def bench_render(frames=400):
+    """Frame time of show_results plus Tk layout while the result set changes
+    the way it does when typing (mostly full lists, occasional short ones),
+    against the old destroy-and-recreate rendering on the same window."""
+    if not search_window:
+        create_search_window()
+    sizes = [8, 8, 5, 8, 3, 8, 8, 1]
+    sets = [[Result("file", None, f"Result {i} of query {j}") for i in range(n)]
+            for j, n in enumerate(sizes)]
+    search_window.deiconify()
+    legacy_widgets = []
+    stats = {}
+    for label, render in (("pooled", lambda results: show_results(results)),
+                          ("rebuild", lambda results: _legacy_render(results, legacy_widgets))):
+        samples = []
+        for f in range(frames):
+            started = time.perf_counter()
+            render(sets[f % len(sets)])
+            search_window.update_idletasks()
+            samples.append((time.perf_counter() - started) * 1000)
+        show_results([])
+        _legacy_render([], legacy_widgets)
+        stats[label] = sorted(samples)
+        print(f"[bench] render {label}: {_format_stats(samples)}")
+    search_window.withdraw()
+    p50 = {label: s[len(s) // 2] for label, s in stats.items()}
+    print(f"[bench] render: pooled p50 is {p50['rebuild'] / max(p50['pooled'], 1e-6):.1f}x faster than rebuild")
+
+def bench_select(moves=2000):
+    """Cost of an Up/Down selection move including the idle repaint."""
+    if not search_window:
+        create_search_window()
+    show_results([Result("file", None, f"Result {i}") for i in range(MAX_RESULTS)])
+    search_window.deiconify()
+    search_window.update_idletasks()
+    samples = []
+    for m in range(moves):
+        started = time.perf_counter()
+        step = m % (2 * (MAX_RESULTS - 1))
+        select_result(step if step < MAX_RESULTS else 2 * (MAX_RESULTS - 1) - step)
+        search_window.update_idletasks()
+        samples.append((time.perf_counter() - started) * 1000)
+    show_results([])
+    search_window.withdraw()
+    print(f"[bench] select: {_format_stats(samples)}")
+
+def bench_calc(rounds=2000):
+    """calculate() against a plain eval() on typical calculator input, as
+    typed keystroke by keystroke. "cold" clears the compile cache every round
+    (first keystrokes of a new expression); "warm" reuses it (retyping)."""
+    inputs = ["2+2", "12*(3+4)", "1024/7", "3.5*2-1", "(1+2)*(3+4)/5", "2**10", "100%7", "-8//3"]
+    typed = [e[:i] for e in inputs for i in range(1, len(e) + 1)]
+    for name, fn, cold in (("calc cold", calculate, True),
+                           ("calc warm", calculate, False),
+                           ("calc eval", lambda e: str(eval(e, {"__builtins__": {}}, {})), False)):
+        samples = []
+        for r in range(rounds):
+            if cold:
+                _calc_cache.clear()
+            started = time.perf_counter()
+            for e in typed:
+                try:
+                    fn(e)
+                except Exception:
+                    pass
+            samples.append((time.perf_counter() - started) * 1000)
+        print(f"[bench] {name} ({len(typed)} exprs): {_format_stats(samples)}")
+    _calc_cache.clear()
+    started = time.perf_counter()
+    result = calculate("9**9**9")
+    print(f"[bench] calc 9**9**9 -> {result} in {(time.perf_counter() - started) * 1000:.2f}ms")
+
+def bench_filters(n=1_000_000, rounds=20):
+    """ext:/size:/modified: queries against a synthetic n-row file index."""
+    import tempfile
+    exts = ("pdf", "docx", "txt", "jpg", "png", "py", "exe", "dll", "mp3", "zip")
+    now = time.time()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench_index.db")
+        conn = sqlite3.connect(db_path)
+        _ensure_index_schema(conn)
+        started = time.perf_counter()
+        conn.executemany("INSERT INTO files VALUES (?, ?, 0, ?, ?, ?, ?)",
+                         ((f"C:\\data\\d{i % 5000}\\{'report' if i % 97 == 0 else 'file'}{i}.{exts[i % 10]}",
+                           f"{'report' if i % 97 == 0 else 'file'}{i}.{exts[i % 10]}",
+                           (i * 7919) % (512 * 1024**2), now - (i % 3650) * 86400, now, exts[i % 10])
+                          for i in range(n)))
+        conn.commit()
+        conn.close()
+        print(f"[bench] filters: built {n:,} rows in {time.perf_counter() - started:.1f}s")
+        for query in ("ext:pdf modified:<7d report", "ext:jpg,png size:>500mb", "modified:<1d",
+                      "size:1mb..2mb ext:zip", "report"):
+            text, filters = parse_file_filters(query, now)
+            samples = []
+            for _ in range(rounds):
+                t0 = time.perf_counter()
+                rows = db_search_entries(text, "file", MAX_RESULTS, filters=filters, db_path=db_path)
+                samples.append((time.perf_counter() - t0) * 1000)
+            print(f"[bench] filters {query!r} ({len(rows)} rows): {_format_stats(samples)}")
+
+def bench_folders(n=1_000_000, rounds=20):
+    """Folder-mode lookups: the folder index against a folder scan of files."""
+    import tempfile
+    words = ("Projects", "Photos", "Backup", "Invoices", "Music", "Archive", "Build", "Reports")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench_index.db")
+        conn = sqlite3.connect(db_path)
+        _ensure_index_schema(conn)
+        folders = [f"C:\\data\\{words[i % 8]}{i // 8}" for i in range(n // 50)]
+        # Interleave folders with their files, as a walk would
+        conn.executemany("INSERT INTO files (path, name, is_directory) VALUES (?, ?, ?)",
+                         ((f"{folders[i // 50]}\\file{i}.dat", f"file{i}.dat", 0) if i % 50 else
+                          (folders[i // 50], folders[i // 50].rsplit("\\", 1)[1], 1) for i in range(n)))
+        conn.commit()
+        conn.close()
+        started = time.perf_counter()
+        build_folder_index(db_path)
+        print(f"[bench] folders: {len(folders):,} folders / {n:,} files, index built in "
+              f"{time.perf_counter() - started:.1f}s")
+        for query in ("invoices1234", "photos", "backup9", "zz"):
+            for label, fn in (("folder index", lambda: folder_search_entries(query, MAX_RESULTS, db_path=db_path)),
+                              ("files scan", lambda: db_search_entries(query, "folder", MAX_RESULTS, db_path=db_path))):
+                samples = []
+                for _ in range(rounds):
+                    t0 = time.perf_counter()
+                    fn()
+                    samples.append((time.perf_counter() - t0) * 1000)
+                print(f"[bench] folders {query!r} {label}: {_format_stats(samples)}")
+
+def bench_rank(rounds=200):
+    """rank_file_entries over synthetic candidate batches of typical and large size."""
+    now = time.time()
+    dirs = ("C:\\Users\\me\\Documents", "C:\\Users\\me\\AppData\\Local\\Temp",
+            "D:\\work\\proj\\node_modules\\pkg\\lib", "C:\\Users\\me\\Desktop\\old\\2019\\misc")
+    for n in (FILE_RANK_CANDIDATES, 5000):
+        entries = [(f"{dirs[i % 4]}\\{'annual_report' if i % 7 == 0 else 'notes'}{i}.pdf", False,
+                    1024 * i, now - (i % 400) * 86400, now) for i in range(n)]
+        samples = []
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            ranked, _ = rank_file_entries("report", entries, now)
+            samples.append((time.perf_counter() - t0) * 1000)
+        print(f"[bench] rank {n} entries (top: {ranked[0][0]}): {_format_stats(samples)}")
+
+LNK_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "lnk")
+
+def bench_lnk(rounds=2000):
+    """Parse the .lnk fixtures, check them against expected.json and time
+    read_lnks over them. Runs on any OS ({here} is the fixture folder)."""
+    with open(os.path.join(LNK_FIXTURES_DIR, "expected.json"), "r", encoding="utf-8") as f:
+        expected = json.load(f)
+    paths = [os.path.join(LNK_FIXTURES_DIR, name) for name in expected]
+    infos = read_lnks(paths)
+    failures = 0
+    for name, path in zip(expected, paths):
+        want, info = expected[name], infos[path]
+        if want is None or info is None:
+            ok = want is None and info is None
+            got = info
+        else:
+            got = {"target": info["target"], "arguments": info["arguments"], "icon": lnk_icon_source(info)}
+            want = {k: v.replace("{here}", LNK_FIXTURES_DIR) for k, v in want.items()}
+            ok = all(ntpath.normpath(got[k]) == ntpath.normpath(v) if k != "arguments" else got[k] == v
+                     for k, v in want.items())
+        if not ok:
+            failures += 1
+            print(f"[bench] lnk {name}: expected {want}, got {got}")
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for path in paths:
+            read_lnk(path)
+        samples.append((time.perf_counter() - t0) * 1000)
+    print(f"[bench] lnk fixtures: {len(paths) - failures}/{len(paths)} as expected; "
+          f"parse {len(paths)} files: {_format_stats(samples)}")
+
+def bench_catalog_memory():
+    print(catalog_memory_report())
+
+BENCHMARKS = {
+    "render": bench_render,
+    "select": bench_select,
+    "calc": bench_calc,
+    "catalog_memory": bench_catalog_memory,
+    "filters": bench_filters,
+    "folders": bench_folders,
+    "rank": bench_rank,
+    "lnk": bench_lnk,
+}
+
+def run_benchmarks(names=None):
+    for name, fn in BENCHMARKS.items():
+        if not names or name in names:
+            fn()
+
+# ========== SINGLE INSTANCE ==========
+
+# The first launch owns a local IPC endpoint (named pipe on Windows, Unix
+# socket elsewhere) and stays resident. Later launches connect, ask it to
+# show (optionally with a query) and exit without indexing or creating Tk.
+# Messages are JSON via send_bytes/recv_bytes, never pickles.
+INSTANCE_NAME = "yoi-" + "".join(c for c in (os.environ.get("USERNAME") or os.environ.get("USER") or "user")
+                                 if c.isalnum() or c in "-_")
+_pending_instance_query = None
+
+def _instance_address():
+    if os.name == "nt":
+        return r"\\.\pipe\{}".format(INSTANCE_NAME), "AF_PIPE"
+    base = os.environ.get("XDG_RUNTIME_DIR") or os.path.expanduser("~")
+    return os.path.join(base, f".{INSTANCE_NAME}.sock"), "AF_UNIX"
+
+def _send_to_resident(message):
+    from multiprocessing.connection import Client
+    address, family = _instance_address()
+    try:
+        with Client(address, family=family) as conn:
+            conn.send_bytes(json.dumps(message).encode("utf-8"))
+        return True
+    except (OSError, EOFError):
+        return False
+
+def _bind_instance_listener():
+    from multiprocessing.connection import Listener
+    address, family = _instance_address()
+    try:
+        return Listener(address, family=family)
+    except OSError:
+        if family != "AF_UNIX":
+            return None
+    # Nobody answered on the socket, so the file is stale
+    try:
+        os.unlink(address)
+        return Listener(address, family=family)
+    except OSError:
+        return None
+
+def show_with_query(query=""):
+    show()
+    if query:
+        entry.insert(0, query)
+        perform_search()
+
+def _handle_instance_message(message):
+    global _pending_instance_query
+    if not isinstance(message, dict) or message.get("cmd") != "show":
+        return
+    query = str(message.get("query") or "")
+    if search_window is None:
+        _pending_instance_query = query
+    else:
+        _tk_call(lambda: show_with_query(query))
+
+def _serve_instance(listener):
+    while True:
+        try:
+            with listener.accept() as conn:
+                message = json.loads(conn.recv_bytes(4096).decode("utf-8"))
+            _handle_instance_message(message)
+        except Exception as e:
+            print(f"[instance] bad request: {e}")
+
+def claim_single_instance(query=""):
+    """Return True if this process should run as the resident instance, or
+    False once the request was handed to an already running one."""
+    message = {"cmd": "show", "query": query}
+    for _ in range(2):
+        if _send_to_resident(message):
+            return False
+        listener = _bind_instance_listener()
+        if listener is not None:
+            threading.Thread(target=_serve_instance, args=(listener,), daemon=True).start()
+            if query:
+                _handle_instance_message(message)
+            return True
+    print("[instance] could not claim or reach the resident instance; running standalone")
+    return True
+
+# ========== MAIN ==========
 
 def create_tray_icon():
     def on_show():
@@ -1275,6 +4268,7 @@ def create_tray_icon():
 
     def on_exit():
         print("[spotlight] exiting...")
+        prefs.flush()
         os._exit(0)
 
     def create_image():
@@ -1295,27 +4289,58 @@ def create_tray_icon():
 
 
 def main():
+    if "--bench" in sys.argv:
+        run_benchmarks(sys.argv[sys.argv.index("--bench") + 1:])
+        return
+
+    startup_mark("module body")
+
+    # Hand off to an already running instance before doing any real work
+    query = " ".join(a for a in sys.argv[1:] if not a.startswith("--"))
+    if not claim_single_instance(query):
+        return
+    startup_mark("single-instance claim")
+
+    apply_tuning()
     print("[spotlight] Using local DB and native file scan")
     print("[spotlight] Basic app search, calculator, and URL support")
     
-    # Index apps WITHOUT icons first (safe before Tk)
-    index_apps(extract_icons=False)
+    # Load the app catalog snapshot; only walk the Start Menu when there is none
+    from_snapshot = load_app_snapshot()
+    if not from_snapshot:
+        index_apps()
+    startup_mark("app catalog (snapshot)" if from_snapshot else "app catalog (full scan)")
     
-    # Create UI (now Tk exists)
+    # Create UI (now Tk exists) and map it once so the first show is fast
     create_search_window()
-    hide()
+    startup_mark("create window")
+    prewarm_window()
+    startup_mark("prewarm window")
     
-    # Now index WITH icons
-    index_apps(extract_icons=True)
-    
-    # Preload remaining icons in background (non-blocking)
-    threading.Thread(target=preload_icons_background, daemon=True).start()
+    if from_snapshot:
+        # Re-scan changed Start Menu directories in the background
+        scheduler.submit("apps_revalidate", revalidate_app_snapshot, JOB_PRIORITY_HIGH)
     
+    # Heavy work runs on the low-priority scheduler and pauses while the UI is in use
+    scheduler.submit("warm_imports", warm_optional_imports, JOB_PRIORITY_HIGH)
+    scheduler.submit("icons", preload_icons_background, JOB_PRIORITY_HIGH, JOB_LANE_ICONS)
+    if not os.path.exists(DB_PATH) and scheduler.has_checkpoint("file_index"):
+        # The checkpoint's done_roots refer to an index that is gone
+        print("[scheduler] index missing; discarding the file_index checkpoint")
+        scheduler.save_checkpoint("file_index", None)
+    scheduler.submit("file_index", maintain_index, JOB_PRIORITY_LOW)
+    scheduler.start()
+
     # Start hotkey watcher
     threading.Thread(target=hotkey_thread, daemon=True).start()
     threading.Thread(target=create_tray_icon, daemon=True).start()
     
+    startup_mark("start background work")
     print(f"[spotlight] ready — press {HOTKEY} to open")
+    if "--startup-report" in sys.argv:
+        print(startup_report())
+    if _pending_instance_query is not None:
+        search_window.after(0, lambda: show_with_query(_pending_instance_query))
     search_window.mainloop()
 
 if __name__ == "__main__":
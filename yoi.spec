@@ -6,7 +6,14 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    # yoi.py imports these lazily by name (_LazyModule), which the analysis can't see
+    hiddenimports=[
+        'PIL.Image', 'PIL.ImageTk', 'PIL.ImageDraw',
+        'win32com', 'win32com.client', 'win32ui', 'win32gui', 'win32con', 'win32api',
+        'rapidfuzz.process', 'rapidfuzz.fuzz',
+        'keyboard', 'pyperclip', 'pystray',
+        'ctypes.wintypes',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],